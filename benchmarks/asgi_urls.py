@@ -0,0 +1,26 @@
+"""Both flavours of the comment views side by side, for `bench_asgi`."""
+from django.urls import include, path
+
+from comments import async_views, views
+
+app_name = "comments"
+
+
+def patterns(module):
+    return [
+        path("view/<uuid:id>", module.hx_view_comment, name="hx_view_comment"),
+        path("toggle/<uuid:id>", module.hx_toggle_comment, name="hx_toggle_comment"),
+        path("edit/<uuid:id>", module.hx_edit_comment, name="hx_edit_comment"),
+        path("delete/<uuid:id>", module.hx_del_comment, name="hx_del_comment"),
+        path(
+            "list/<int:content_type_id>/<str:object_id>",
+            module.hx_list_comments,
+            name="hx_list_comments",
+        ),
+    ]
+
+
+urlpatterns = [
+    path("sync/", include((patterns(views), "comments"))),
+    path("async/", include((patterns(async_views), "comments"), namespace="async")),
+]
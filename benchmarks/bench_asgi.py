@@ -0,0 +1,47 @@
+"""Requests per second of the sync `views` and the native `async_views`, both
+served through Django's ASGI handler (`django.test.AsyncClient`), with a batch
+of concurrent requests in flight."""
+import asyncio
+import time
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.contenttypes.models import ContentType
+from django.test import AsyncClient
+
+from .conftest import seed_comments
+
+REQUESTS = 500
+CONCURRENCY = 20
+
+
+async def requests_per_second(client: AsyncClient, url: str) -> float:
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def one():
+        async with semaphore:
+            response = await client.get(url)
+            assert response.status_code == 200
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(REQUESTS)))
+    return REQUESTS / (time.perf_counter() - start)
+
+
+@pytest.mark.django_db(transaction=True)
+def bench_sync_vs_async_views(settings, bench_sentinels, bench_authors):
+    settings.ROOT_URLCONF = "benchmarks.asgi_urls"
+    target = bench_sentinels[0]
+    seed_comments(target, bench_authors, 200, public_every=1)
+    comment = target.comments.first()
+    ct = ContentType.objects.get_for_model(target)
+    endpoints = {
+        "hx_view_comment": f"view/{comment.id}",
+        "hx_list_comments": f"list/{ct.id}/{target.pk}",
+    }
+    client = AsyncClient()
+    print()
+    for name, url in endpoints.items():
+        sync_rps = async_to_sync(requests_per_second)(client, f"/sync/{url}")
+        async_rps = async_to_sync(requests_per_second)(client, f"/async/{url}")
+        print(f"{name}: sync {sync_rps:.0f} req/s, async {async_rps:.0f} req/s")
@@ -0,0 +1,74 @@
+"""Render cost of the owner's card footer, whose edit / delete / toggle links were
+each a `{% url %}` (a resolver `reverse()` per link per card) before being joined
+from prefixes reversed once, see `comments.models.comment_url()`."""
+import uuid
+
+import pytest
+from django.template import Context, Template, engines
+from django.utils.timezone import now
+
+from comments.models import Comment
+
+from .harness import measure
+
+CARDS = 500
+REPEAT = 20
+URL_TAGS = {
+    "{{ comment.edit_url }}": "{% url 'comments:hx_edit_comment' comment.id %}",
+    "{{ comment.delete_url }}": "{% url 'comments:hx_del_comment' comment.id %}",
+    "{{ comment.toggle_url }}": "{% url 'comments:hx_toggle_comment' comment.id %}",
+}
+
+
+def template_source(name: str) -> str:
+    engine = engines["django"].engine
+    return engine.get_template(f"comments/{name}").source
+
+
+def detail_with_url_tags() -> Template:
+    """`comments/detail.html` as it was: toggle inlined, links reversed per card."""
+    source = template_source("detail.html").replace(
+        "{% include './toggle.html' %}", template_source("toggle.html")
+    )
+    for attribute, tag in URL_TAGS.items():
+        source = source.replace(attribute, tag)
+    return Template(source)
+
+
+def detail_with_prefixes() -> Template:
+    source = template_source("detail.html").replace(
+        "{% include './toggle.html' %}", template_source("toggle.html")
+    )
+    return Template(source)
+
+
+@pytest.mark.django_db
+def bench_card_urls(bench_authors):
+    author = bench_authors[0]
+    cards = [
+        Comment(id=uuid.uuid4(), author=author, content=f"Card {i}", created=now())
+        for i in range(CARDS)
+    ]
+
+    def render_all(template: Template):
+        for comment in cards:
+            template.render(Context({"comment": comment, "user": author}))
+
+    before = measure(
+        "card render, {% url %}",
+        CARDS,
+        lambda: render_all(detail_with_url_tags()),
+        repeat=REPEAT,
+    )
+    after = measure(
+        "card render, url prefixes",
+        CARDS,
+        lambda: render_all(detail_with_prefixes()),
+        repeat=REPEAT,
+    )
+    print(
+        f"\nper card: {before.p50_ms / CARDS * 1_000:.1f}us with {{% url %}},"
+        f" {after.p50_ms / CARDS * 1_000:.1f}us with url prefixes"
+    )
+    assert "{% url" not in template_source("detail.html")
+    assert "{% url" not in template_source("toggle.html")
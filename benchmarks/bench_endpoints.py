@@ -0,0 +1,129 @@
+"""Latency, query count and peak allocations of the comment paths, for threads
+of `harness.SIZES` comments. Results are summarized at the end of the run."""
+import re
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import Client
+from django.urls import reverse
+
+from comments.models import Comment
+
+from .conftest import seed_comments
+from .harness import SIZES, measure
+
+REPEAT = 30
+THREAD = Template("{% load comments %}{% list_comments object %}")
+
+
+@pytest.fixture(params=SIZES, ids=lambda size: f"{size}")
+def thread(request, bench_sentinels, bench_authors):
+    target, author = bench_sentinels[0], bench_authors[0]
+    seed_comments(target, bench_authors, request.param)
+    owned = target.comments.filter(author=author).first()
+    return request.param, target, author, owned
+
+
+def url(name: str, comment) -> str:
+    return reverse(f"comments:{name}", kwargs={"id": comment.id})
+
+
+ON_LOAD = re.compile(r'hx-trigger="load"\s+hx-get="([^"]+)"')
+
+
+def as_htmx(client: Client, response):
+    """Also make the requests htmx would fire as soon as `response` is swapped in,
+    i.e. `hx-trigger="load"`; returns how many requests were made in all."""
+    requests = 1
+    for follow_up in ON_LOAD.findall(response.content.decode()):
+        requests += as_htmx(client, client.get(follow_up))
+    return requests
+
+
+@pytest.mark.django_db
+def bench_list_comments(thread):
+    size, target, author, _ = thread
+    measure(
+        "list_comments anonymous, cold",
+        size,
+        lambda: THREAD.render(Context({"object": target, "user": AnonymousUser()})),
+        repeat=REPEAT,
+        setup=lambda: cache.clear() or (),
+    )
+    measure(
+        "list_comments anonymous, cached",
+        size,
+        lambda: THREAD.render(Context({"object": target, "user": AnonymousUser()})),
+        repeat=REPEAT,
+    )
+    measure(
+        "list_comments authenticated",
+        size,
+        lambda: THREAD.render(Context({"object": target, "user": author})),
+        repeat=REPEAT,
+    )
+
+
+@pytest.mark.django_db
+def bench_comment_endpoints(thread):
+    size, target, author, owned = thread
+    client = Client()
+    client.force_login(author)
+
+    def fresh_comment():
+        comment = Comment.objects.create(
+            content="To be deleted", author=author, content_object=target
+        )
+        return (url("hx_del_comment", comment),)
+
+    measure(
+        "hx_view_comment",
+        size,
+        lambda: client.get(url("hx_view_comment", owned)),
+        repeat=REPEAT,
+    )
+    measure(
+        "hx_edit_comment GET",
+        size,
+        lambda: client.get(url("hx_edit_comment", owned)),
+        repeat=REPEAT,
+    )
+    measure(
+        "hx_edit_comment POST",
+        size,
+        lambda: client.post(
+            url("hx_edit_comment", owned), {"content": "Edited", "is_public": True}
+        ),
+        repeat=REPEAT,
+    )
+    measure(
+        "hx_toggle_comment",
+        size,
+        lambda: client.post(url("hx_toggle_comment", owned)),
+        repeat=REPEAT,
+    )
+    measure(
+        "hx_del_comment",
+        size,
+        lambda url: client.delete(url),
+        repeat=REPEAT,
+        setup=fresh_comment,
+    )
+    measure(
+        "add comment POST",
+        size,
+        lambda: as_htmx(
+            client, client.post(target.add_comment_url, {"content": "Added"})
+        ),
+        repeat=REPEAT,
+    )
+    measure(
+        "thread page GET",
+        size,
+        lambda: as_htmx(client, client.get(target.get_absolute_url())),
+        repeat=REPEAT,
+    )
+    response = client.post(target.add_comment_url, {"content": "Added"})
+    print(f"\nrequests per comment added: {as_htmx(client, response)}")
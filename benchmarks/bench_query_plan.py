@@ -0,0 +1,64 @@
+"""Query plan of the `list_comments` thread lookup, with and without the
+`Comment.Meta.indexes`. `QuerySet.explain()` is vendor-agnostic, so the same
+benchmark reports SQLite (`config.settings`) and Postgres plans, e.g.
+`pytest benchmarks -s --ds=<settings module with a postgres DATABASES>`."""
+import time
+
+import pytest
+from django.db import connection
+from django.db.models import Q
+
+from comments.models import Comment, object_pk_field
+
+from .conftest import seed_comments
+
+COMMENTS_PER_TARGET = 2_000
+REPEAT = 50
+
+
+def thread_queryset(target, user):
+    return target.comments.filter(Q(is_public=True) | Q(author=user))
+
+
+def timed(qs) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        list(qs[:20])
+    return (time.perf_counter() - start) / REPEAT * 1_000
+
+
+def analyze():
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+
+@pytest.mark.django_db(transaction=True)
+def bench_thread_query_plan(bench_sentinels, bench_authors):
+    for target in bench_sentinels[:10]:
+        seed_comments(target, bench_authors, COMMENTS_PER_TARGET)
+    analyze()
+    target, user = bench_sentinels[5], bench_authors[0]
+    qs = thread_queryset(target, user)
+
+    indexed_plan, indexed_ms = qs.explain(), timed(qs)
+    with connection.schema_editor() as editor:
+        for index in Comment._meta.indexes:
+            editor.remove_index(Comment, index)
+    analyze()
+    try:
+        plain_plan, plain_ms = qs.explain(), timed(qs)
+    finally:
+        with connection.schema_editor() as editor:
+            for index in Comment._meta.indexes:
+                editor.add_index(Comment, index)
+
+    print(f"\n[{connection.vendor}] thread lookup without indexes: {plain_ms:.3f}ms")
+    print(plain_plan)
+    print(f"[{connection.vendor}] thread lookup with indexes: {indexed_ms:.3f}ms")
+    print(indexed_plan)
+    # the thread goes through the indexes on the typed column of the target's pk
+    column = object_pk_field(type(target))
+    typed = [index.name for index in Comment._meta.indexes if column in index.fields]
+    used = [index.name for index in Comment._meta.indexes if index.name in indexed_plan]
+    assert used and set(used) <= set(typed), used
+    assert not any(index.name in plain_plan for index in Comment._meta.indexes)
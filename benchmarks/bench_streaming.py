@@ -0,0 +1,33 @@
+"""Peak allocations of rendering a whole thread at once against streaming it in
+chunks of `COMMENTS_STREAM_CHUNK_SIZE`: the former grows with the thread, the
+latter should stay flat."""
+import pytest
+
+from comments.streaming import _render, stream_thread
+
+from .conftest import seed_comments
+from .harness import SIZES, measure
+
+REPEAT = 3
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("size", SIZES, ids=lambda size: f"{size}")
+def bench_whole_thread(size, bench_sentinels, bench_authors):
+    target, user = bench_sentinels[0], bench_authors[0]
+    seed_comments(target, bench_authors, size)
+    visible = target.comments.visible_to(user).for_cards()
+
+    def consume():
+        for _ in stream_thread(visible, user):
+            pass
+
+    whole = measure(
+        "whole thread, one string",
+        size,
+        lambda: _render(list(visible.all()), user),
+        repeat=REPEAT,
+    )
+    streamed = measure("whole thread, streamed", size, consume, repeat=REPEAT)
+    if size > 10_000:
+        assert streamed.peak_kib < whole.peak_kib / 4
@@ -0,0 +1,37 @@
+"""Peak allocations and time of exporting a thread to JSON Lines and importing it
+back: both stream, so peak allocations should stay flat as the thread grows
+while the time grows with it."""
+import re
+
+import pytest
+
+from comments.models import Comment
+from comments.transfer import dump, load
+
+from .conftest import seed_comments
+from .harness import SIZES, measure
+
+REPEAT = 2
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("size", SIZES, ids=lambda size: f"{size}")
+def bench_transfer(size, bench_sentinels, bench_authors):
+    seed_comments(bench_sentinels[0], bench_authors, size)
+
+    def export():
+        for _ in dump(Comment.objects.all()):
+            pass
+
+    def import_():
+        for _ in load(iter(lines)):
+            pass
+
+    exported = measure("export as JSON lines", size, export, repeat=REPEAT)
+    # allocated outside of `measure()`, and without ids: each import adds a copy
+    lines = [
+        re.sub(r'^{"id": "[^"]+", ', "{", line) for line in dump(Comment.objects.all())
+    ]
+    imported = measure("import from JSON lines", size, import_, repeat=REPEAT)
+    if size > 10_000:
+        assert exported.peak_kib < 8 * 1024 and imported.peak_kib < 16 * 1024
@@ -0,0 +1,54 @@
+import os
+
+import pytest
+from django.contrib.contenttypes.models import ContentType
+
+from comments.models import Comment
+from sentinels.models import Sentinel
+
+from . import harness
+
+
+def seed_comments(target, authors, size: int, public_every: int = 2):
+    """Bulk insert `size` comments on `target`, rotating through `authors` and
+    making every `public_every`-th comment public."""
+    ct = ContentType.objects.get_for_model(target)
+    Comment.objects.bulk_create(
+        (
+            Comment(
+                content=f"Benchmark comment {i}",
+                author=authors[i % len(authors)],
+                content_type=ct,
+                object_id=str(target.pk),
+                is_public=i % public_every == 0,
+            )
+            for i in range(size)
+        ),
+        batch_size=1000,
+    )
+
+
+@pytest.fixture
+def bench_authors(django_user_model):
+    return [
+        django_user_model.objects.create(username=f"bench{i}", password="x")
+        for i in range(10)
+    ]
+
+
+@pytest.fixture
+def bench_sentinels():
+    return Sentinel.objects.bulk_create(
+        Sentinel(title=f"Benchmark {i}") for i in range(50)
+    )
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not harness.results:
+        return
+    terminalreporter.section("comment benchmarks")
+    for line in harness.report():
+        terminalreporter.write_line(line)
+    if os.environ.get("COMMENTS_BENCH_SAVE"):
+        harness.save_baseline()
+        terminalreporter.write_line(f"baseline saved to {harness.BASELINE}")
@@ -0,0 +1,134 @@
+"""Latency percentiles, SQL query count and peak allocations of a callable, with
+results kept across runs as a JSON baseline:
+
+    COMMENTS_BENCH_SAVE=1 pytest benchmarks -s  # record the baseline
+    pytest benchmarks -s  # compare against it
+
+`COMMENTS_BENCH_BASELINE` moves the baseline file, `COMMENTS_BENCH_SIZES` picks
+the thread sizes to seed (comma separated)."""
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from django.db import connection
+
+BASELINE = Path(
+    os.environ.get("COMMENTS_BENCH_BASELINE", Path(__file__).parent / "baseline.json")
+)
+SIZES = [
+    int(size)
+    for size in os.environ.get("COMMENTS_BENCH_SIZES", "10,1000,50000").split(",")
+]
+
+
+@dataclass
+class Result:
+    name: str
+    size: int
+    p50_ms: float
+    p99_ms: float
+    queries: int
+    peak_kib: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}[{self.size}]"
+
+
+results: List[Result] = []
+
+
+class QueryCounter:
+    """Counts executed SQL; unlike `CaptureQueriesContext`, not reset by the
+    `request_started` signal of the test client."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self._wrapper = connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        self._wrapper.__exit__(*exc)
+
+
+def measure(
+    name: str,
+    size: int,
+    func: Callable,
+    repeat: int = 50,
+    setup: Optional[Callable[[], tuple]] = None,
+) -> Result:
+    """Call `func(*setup())` `repeat` times (`setup` is not timed), then once more
+    under query capture and once more under `tracemalloc`."""
+    setup = setup or tuple
+    func(*setup())  # warm up caches of the process, e.g. content types, templates
+    timings = []
+    for _ in range(repeat):
+        args = setup()
+        start = time.perf_counter()
+        func(*args)
+        timings.append((time.perf_counter() - start) * 1_000)
+
+    args = setup()
+    with QueryCounter() as counter:
+        func(*args)
+
+    args = setup()
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    quantiles = statistics.quantiles(timings, n=100)
+    result = Result(
+        name=name,
+        size=size,
+        p50_ms=round(quantiles[49], 3),
+        p99_ms=round(quantiles[98], 3),
+        queries=counter.count,
+        peak_kib=round(peak / 1024, 1),
+    )
+    results.append(result)
+    return result
+
+
+def load_baseline() -> Dict[str, dict]:
+    if BASELINE.exists():
+        return json.loads(BASELINE.read_text())
+    return {}
+
+
+def save_baseline():
+    BASELINE.write_text(
+        json.dumps({r.key: asdict(r) for r in results}, indent=2, sort_keys=True)
+    )
+
+
+def report() -> List[str]:
+    """One line per result, with the change against the baseline if recorded."""
+    baseline = load_baseline()
+    lines = [
+        f"{'benchmark':<40} {'p50 ms':>9} {'p99 ms':>9} {'queries':>8} {'peak KiB':>9}"
+    ]
+    for r in results:
+        line = (
+            f"{r.key:<40} {r.p50_ms:>9.3f} {r.p99_ms:>9.3f} {r.queries:>8}"
+            f" {r.peak_kib:>9.1f}"
+        )
+        if before := baseline.get(r.key):
+            change = (r.p50_ms - before["p50_ms"]) / before["p50_ms"] * 100
+            line += f"  p50 {change:+.1f}%, queries {r.queries - before['queries']:+}"
+        lines.append(line)
+    return lines
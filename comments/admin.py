@@ -1,3 +1,32 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 
-# Register your models here.
+from .models import Comment
+
+
+@admin.register(Comment)
+class CommentAdmin(admin.ModelAdmin):
+    """Moderation: every action is a single bulk operation on `CommentQuerySet`,
+    and deletion goes through `CommentQuerySet.discard()`, so target counters and
+    cached threads stay consistent."""
+
+    list_display = ("id", "author", "content_type", "object_id", "is_public")
+    list_filter = ("is_public", "content_type")
+    list_select_related = ("author", "content_type")
+    search_fields = ("content",)
+    actions = ("make_public", "make_private", "delete_by_author")
+
+    @admin.action(description="Make selected comments public")
+    def make_public(self, request, queryset):
+        updated = queryset.set_public(True)
+        self.message_user(request, f"{updated} comments made public.")
+
+    @admin.action(description="Make selected comments private")
+    def make_private(self, request, queryset):
+        updated = queryset.set_public(False)
+        self.message_user(request, f"{updated} comments made private.")
+
+    @admin.action(description="Delete every comment by the authors of the selected")
+    def delete_by_author(self, request, queryset):
+        authors = set(queryset.values_list("author_id", flat=True))
+        deleted = Comment.objects.filter(author_id__in=authors).discard()
+        self.message_user(request, f"{deleted} comments deleted.", messages.WARNING)
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class CommentsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "comments"
+
+    def ready(self):
+        from .cache import bump_generations
+        from .counters import update_counters
+        from .registry import registry
+        from .signals import comments_changed
+
+        comments_changed.connect(update_counters, dispatch_uid="comment_counters")
+        comments_changed.connect(bump_generations, dispatch_uid="comment_threads")
+        registry.discover()
@@ -0,0 +1,185 @@
+"""Cold storage for old threads: `archive_comments` moves whole threads out of
+`Comment` into `ArchivedComment`, so that the live table and the indexes behind
+every `{% list_comments %}` only hold threads still in use. Threads move whole,
+never single comments, so replies always stay with their parents.
+
+Archived threads are never written to again, so their rendering is cached until
+more of the same thread is archived; they are read through
+`{% list_archived_comments %}` or `comments:archived_comments`, public comments
+only, and counted by the targets' comment counters as before."""
+import time
+from collections import defaultdict
+from typing import Iterable, Iterator, List, Tuple
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import models, transaction
+from django.db.models import Count, Max, Q
+from django.template.loader import get_template
+from django.urls import reverse
+
+from .cache import get_cache
+from .conf import get_setting
+from .models import SEGMENT, ArchivedComment, Comment, object_pk_field
+from .routers import use_primary
+from .signals import comments_changed
+
+ARCHIVED = "comments/archived.html"
+FIELDS = [
+    field.attname
+    for field in ArchivedComment._meta.concrete_fields
+    if field.name != "archived_at"
+]
+
+DELETE_BATCH = 500  # pks per `DELETE`, within the bound on query parameters
+
+Target = Tuple[int, str]  # content type id, object id
+
+
+def archive_url(content_type_id: int, object_id) -> str:
+    return reverse(
+        "comments:archived_comments",
+        kwargs={"content_type_id": content_type_id, "object_id": object_id},
+    )
+
+
+def archive_key(content_type_id: int, object_id) -> str:
+    return f"comments:archive:{content_type_id}:{object_id}"
+
+
+def _targets_q(targets: Iterable[Target]) -> Q:
+    """One `IN` per content type, rather than one term per target."""
+    object_ids = defaultdict(list)
+    for content_type_id, object_id in targets:
+        object_ids[content_type_id].append(object_id)
+    return Q(
+        *(
+            Q(content_type_id=content_type_id, object_id__in=ids)
+            for content_type_id, ids in object_ids.items()
+        ),
+        _connector=Q.OR,
+    )
+
+
+def stale_threads(before) -> models.QuerySet:
+    """`(content_type_id, object_id, size)` of each thread without a comment
+    written since `before`."""
+    return (
+        Comment.all_objects.order_by()
+        .values_list("content_type_id", "object_id")
+        .annotate(size=Count("pk"), last=Max("modified"))
+        .filter(last__lt=before)
+        .values_list("content_type_id", "object_id", "size")
+    )
+
+
+def closed_threads() -> Iterator[Tuple[int, str, int]]:
+    """`(content_type_id, object_id, size)` of each thread of a target listed by
+    its model's `closed_for_comments()`, matched on the typed column of its pk."""
+    from .registry import registry
+
+    for model in registry.lookups:
+        closed = model.closed_for_comments()
+        if not closed.query.is_empty():
+            ct = ContentType.objects.get_for_model(model)
+            lookup = f"{object_pk_field(model)}__in"
+            yield from (
+                Comment.all_objects.filter(
+                    content_type=ct, **{lookup: closed.values("pk")}
+                )
+                .order_by()
+                .values_list("content_type_id", "object_id")
+                .annotate(size=Count("pk"))
+            )
+
+
+def archive_threads(targets: List[Target], before=None) -> int:
+    """Move the threads of `targets` into `ArchivedComment`, in one transaction.
+    Their rows are locked and, with `before`, threads written to since then are
+    left out. Only the rows read are deleted, so a comment written meanwhile
+    stays live rather than being lost. Soft-deleted comments are purged rather
+    than archived. Returns how many comments were archived."""
+    with transaction.atomic():
+        rows = list(
+            Comment.all_objects.filter(_targets_q(targets))
+            .select_for_update()
+            .order_by("path")
+            .values(*FIELDS, "deleted_at")
+        )
+        if before is not None:
+            active = {
+                (row["content_type_id"], row["object_id"])
+                for row in rows
+                if row["modified"] >= before
+            }
+            rows = [
+                row
+                for row in rows
+                if (row["content_type_id"], row["object_id"]) not in active
+            ]
+            targets = [target for target in targets if target not in active]
+        archived = ArchivedComment.objects.bulk_create(
+            ArchivedComment(**{name: row[name] for name in FIELDS})
+            for row in rows
+            if row["deleted_at"] is None
+        )
+        pks = [row["id"] for row in rows]
+        for start in range(0, len(pks), DELETE_BATCH):
+            doomed = Comment.all_objects.filter(
+                pk__in=pks[start : start + DELETE_BATCH]
+            )
+            models.QuerySet.delete(doomed)
+        # nothing to count: archived comments still count for their targets
+        comments_changed.send(sender=Comment, deltas=dict.fromkeys(targets, (0, 0)))
+        keys = [archive_key(*target) for target in targets]
+        transaction.on_commit(lambda: get_cache().delete_many(keys))
+    return len(archived)
+
+
+def archive(
+    threads: Iterable[Tuple[int, str, int]],
+    batch_size: int,
+    pause: float = 0,
+    before=None,
+) -> Iterator[int]:
+    """Archive `threads`, e.g. `stale_threads(before)`, as many whole threads per
+    transaction as fit in `batch_size` comments (a larger thread goes alone),
+    pausing `pause` seconds in between; with `before`, threads written to since
+    are skipped, see `archive_threads()`. Yields the comments archived per batch."""
+    threads = list(threads)  # keys only; the rows they describe are about to go
+    batch: List[Target] = []
+    size = 0
+    for content_type_id, object_id, thread_size in threads:
+        if batch and size + thread_size > batch_size:
+            yield archive_threads(batch, before)
+            time.sleep(pause)
+            batch, size = [], 0
+        batch.append((content_type_id, object_id))
+        size += thread_size
+    if batch:
+        yield archive_threads(batch, before)
+
+
+def archived_thread(content_type_id: int, object_id) -> str:
+    """The public comments archived for a target, in thread order, rendered once
+    and then served from `COMMENTS_CACHE_ALIAS`; empty if there are none. Read
+    from the primary, as the cache is cleared on commit of an archival that a
+    replica may not have yet."""
+    key = archive_key(content_type_id, object_id)
+    html = get_cache().get(key)
+    if html is None:
+        rows = (
+            ArchivedComment.objects.for_target(content_type_id, object_id)
+            .visible_to(None)
+            .select_related("author")
+            .order_by("path")
+        )
+        shown, comments = {""}, []
+        with use_primary():
+            rows = list(rows)
+        for comment in rows:  # without replies below private ones, as `arrange()`
+            if comment.path[:-SEGMENT] in shown:
+                shown.add(comment.path)
+                comments.append(comment)
+        html = get_template(ARCHIVED).render({"comments": comments})
+        get_cache().set(key, html, get_setting("COMMENTS_ARCHIVE_CACHE_TIMEOUT"))
+    return html
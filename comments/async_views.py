@@ -0,0 +1,287 @@
+"""Native async counterparts of `views`, under the same names so that
+`comments/urls.py` can route to either, see `COMMENTS_ASYNC_VIEWS`. Under ASGI
+these skip the per-request trip through the sync-to-async thread bridge."""
+import uuid
+from functools import wraps
+from typing import Awaitable, Callable, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.contrib.auth.views import redirect_to_login
+from django.http import (
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseNotAllowed,
+    StreamingHttpResponse,
+)
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .archive import archived_thread
+from .cache import forget_card
+from .forms import CommentModelForm
+from .instrumentation import instrumented
+from .models import Comment
+from .pagination import aget_page, page_url
+from .registry import registry
+from .replies import aload_replies
+from .streaming import astream_thread
+from .throttle import throttled
+from .views import (
+    CARD,
+    CARD_VERSION,
+    EDITOR,
+    FORM,
+    INSERTER,
+    PAGE,
+    PAGE_AGGREGATES,
+    REPLIES,
+    REPLY,
+    Validators,
+    archived_response,
+    card_validators_of,
+    inserted_context,
+    page_validators_of,
+    search_page,
+)
+
+
+async def aget_user(request: HttpRequest):
+    """The authenticated user or `AnonymousUser`, resolved without blocking the
+    event loop; also primes `request.user` for the sync template render."""
+    if not hasattr(request, "_acached_user"):
+        if hasattr(request, "auser"):  # Django 5.0+
+            request._acached_user = await request.auser()
+        elif hasattr(request, "session"):
+            request._acached_user = await sync_to_async(get_user)(request)
+        else:
+            request._acached_user = request.user
+        request.user = request._acached_user
+    return request._acached_user
+
+
+def alogin_required(view: Callable[..., Awaitable[HttpResponse]]):
+    @wraps(view)
+    async def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        if not (await aget_user(request)).is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def arequire_http_methods(methods):
+    def decorator(view: Callable[..., Awaitable[HttpResponse]]):
+        @wraps(view)
+        async def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+            if request.method not in methods:
+                return HttpResponseNotAllowed(methods)
+            return await view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def aconditional(validators: Callable[..., Awaitable[Validators]]):
+    """Async `views.conditional()`"""
+
+    def decorator(view: Callable[..., Awaitable[HttpResponse]]):
+        @wraps(view)
+        async def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+            etag, modified = await validators(request, *args, **kwargs)
+            etag = quote_etag(etag) if etag else None
+            timestamp = int(modified.timestamp()) if modified else None
+            response = get_conditional_response(
+                request, etag=etag, last_modified=timestamp
+            )
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            if request.method in ("GET", "HEAD"):
+                if timestamp and not response.has_header("Last-Modified"):
+                    response.headers["Last-Modified"] = http_date(timestamp)
+                if etag:
+                    response.headers.setdefault("ETag", etag)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+async def aadd_comment_to(
+    request: HttpRequest, content_type_id: int, object_id
+) -> HttpResponse:
+    """Async `views.add_comment_to()`"""
+    user = await aget_user(request)
+    if not user.is_authenticated:  # required to comment
+        return redirect("%s?next=%s" % (settings.LOGIN_URL, request.path))
+
+    form = CommentModelForm(request.POST or None)
+    if request.method == "POST" and await sync_to_async(form.is_valid)():
+        comment = form.save(commit=False)
+        comment.author = user
+        comment.content_type_id, comment.object_id = content_type_id, str(object_id)
+        await comment.asave()
+        return TemplateResponse(request, INSERTER, inserted_context(request, comment))
+    return TemplateResponse(request, FORM, {"form": form})
+
+
+@instrumented("add_comment")
+@throttled
+async def add_comment(
+    request: HttpRequest, content_type_id: int, lookup: str
+) -> HttpResponse:
+    model = await sync_to_async(registry.resolve)(content_type_id)
+    object_id = model and await registry.atarget_pk(model, lookup)
+    if object_id is None:
+        raise Http404(f"No commentable {content_type_id}/{lookup}")
+    return await aadd_comment_to(request, content_type_id, object_id)
+
+
+async def card_validators(request: HttpRequest, id: uuid.UUID) -> Validators:
+    row = await Comment.objects.filter(id=id).values_list(*CARD_VERSION).afirst()
+    return card_validators_of(id, row, await aget_user(request))
+
+
+async def page_validators(
+    request: HttpRequest, content_type_id: int, object_id: str
+) -> Validators:
+    user = await aget_user(request)
+    visible = Comment.objects.for_target(content_type_id, object_id)
+    found = await visible.visible_to(user).aaggregate(**PAGE_AGGREGATES)
+    return page_validators_of(request, user, found)
+
+
+@instrumented("hx_list_comments")
+@arequire_http_methods(["GET"])
+@aconditional(page_validators)
+async def hx_list_comments(
+    request: HttpRequest, content_type_id: int, object_id: str
+) -> HttpResponse:
+    comments = Comment.objects.for_target(content_type_id, object_id)
+    try:
+        page, cursor = await aget_page(
+            comments.visible_to(await aget_user(request)).top_level().for_cards(),
+            request.GET.get("cursor"),
+        )
+    except ValueError:
+        return HttpResponseBadRequest()
+    next_url = cursor and page_url(content_type_id, object_id, cursor)
+    return TemplateResponse(request, PAGE, {"comments": page, "next_url": next_url})
+
+
+@arequire_http_methods(["GET"])
+async def stream_comments(
+    request: HttpRequest, content_type_id: int, object_id: str
+) -> StreamingHttpResponse:
+    user = await aget_user(request)
+    comments = Comment.objects.for_target(content_type_id, object_id)
+    cards = astream_thread(comments.visible_to(user).for_cards(), user)
+    return StreamingHttpResponse(cards, content_type="text/html; charset=utf-8")
+
+
+@instrumented("archived_comments")
+@arequire_http_methods(["GET"])
+async def archived_comments(
+    request: HttpRequest, content_type_id: int, object_id: str
+) -> HttpResponse:
+    html = await sync_to_async(archived_thread)(content_type_id, object_id)
+    return archived_response(html)
+
+
+@instrumented("search_comments")
+@arequire_http_methods(["GET"])
+async def search_comments(
+    request: HttpRequest,
+    content_type_id: Optional[int] = None,
+    object_id: Optional[str] = None,
+) -> HttpResponse:
+    comments = Comment.objects.visible_to(await aget_user(request)).for_cards()
+    if content_type_id is not None:
+        comments = comments.for_target(content_type_id, object_id)
+    try:
+        page, next_url = await sync_to_async(search_page)(
+            request, comments, request.GET.get("q", "")
+        )
+    except ValueError:
+        return HttpResponseBadRequest()
+    return TemplateResponse(request, PAGE, {"comments": page, "next_url": next_url})
+
+
+async def aget_visible(request: HttpRequest, id: uuid.UUID, *fields) -> Comment:
+    visible = Comment.objects.visible_to(await aget_user(request))
+    comment = (
+        await (visible.only(*fields) if fields else visible).filter(id=id).afirst()
+    )
+    if comment is None:
+        raise Http404(f"No comment {id}")
+    return comment
+
+
+@instrumented("hx_list_replies")
+@arequire_http_methods(["GET"])
+async def hx_list_replies(request: HttpRequest, id: uuid.UUID) -> TemplateResponse:
+    root = await aget_visible(request, id, "id", "path", "depth")
+    replies = await aload_replies(root, request.user)
+    return TemplateResponse(request, REPLIES, {"comments": replies})
+
+
+@instrumented("hx_reply_comment")
+@throttled
+@alogin_required
+async def hx_reply_comment(request: HttpRequest, id: uuid.UUID) -> TemplateResponse:
+    parent = await aget_visible(request, id)
+    form = CommentModelForm(request.POST or None)
+    if request.method == "POST" and await sync_to_async(form.is_valid)():
+        reply = form.save(commit=False)
+        reply.author, reply.parent = request.user, parent
+        await reply.asave()
+        return TemplateResponse(request, REPLY, {"comment": reply})
+    return TemplateResponse(request, EDITOR, {"form": form})
+
+
+@instrumented("hx_view_comment")
+@aconditional(card_validators)
+async def hx_view_comment(request: HttpRequest, id: uuid.UUID) -> TemplateResponse:
+    comment = await Comment.objects.filter(id=id).afirst()
+    if comment is None:
+        raise Http404(f"No comment {id}")
+    return TemplateResponse(request, CARD, {"comment": comment})
+
+
+@instrumented("hx_toggle_comment")
+@throttled
+@alogin_required
+async def hx_toggle_comment(request: HttpRequest, id: uuid.UUID) -> TemplateResponse:
+    comment = await sync_to_async(Comment.objects.toggle_for_user)(id, request.user)
+    await sync_to_async(forget_card)(id)
+    return TemplateResponse(request, CARD, {"comment": comment})
+
+
+@instrumented("hx_del_comment")
+@throttled
+@alogin_required
+@arequire_http_methods(["DELETE"])
+async def hx_del_comment(request: HttpRequest, id: uuid.UUID) -> HttpResponse:
+    await sync_to_async(Comment.objects.delete_for_user)(id, request.user)
+    await sync_to_async(forget_card)(id)
+    return HttpResponse(status=200, headers={"HX-Trigger": "commentDeleted"})
+
+
+@instrumented("hx_edit_comment")
+@throttled
+@alogin_required
+async def hx_edit_comment(request: HttpRequest, id: uuid.UUID) -> TemplateResponse:
+    comment = await Comment.aget_for_user(id, request.user)
+    form = CommentModelForm(request.POST or None, instance=comment)
+    if request.method == "POST" and await sync_to_async(form.is_valid)():
+        await sync_to_async(forget_card)(comment.id)
+        await comment.asave(update_fields=["content", "is_public", "modified"])
+        return TemplateResponse(request, CARD, {"comment": comment})
+    return TemplateResponse(request, CARD, {"form": form, "comment": comment})
@@ -0,0 +1,111 @@
+import uuid
+from collections import Counter
+from typing import Callable, Dict
+
+from django.core.cache import caches
+from django.db import transaction
+from django.template.context import Context
+from django.utils.safestring import SafeString, mark_safe
+
+from .conf import get_setting
+
+DETAIL = "comments/detail.html"
+
+card_stats: Counter = Counter()
+"""Per-process `hits` / `misses` of the rendered card cache."""
+
+thread_stats: Counter = Counter()
+"""Per-process `hits` / `misses` of the anonymous thread cache."""
+
+
+def get_cache():
+    return caches[get_setting("COMMENTS_CACHE_ALIAS")]
+
+
+def card_key(comment_id: uuid.UUID, is_owner: bool) -> str:
+    """Owners see the edit / delete / toggle footer, everyone else the same card."""
+    return f"comments:card:{comment_id.hex}:{int(is_owner)}"
+
+
+def card_version(comment) -> str:
+    """Stored along with the card: `modified` retires it whenever the comment is
+    saved, `reply_count` whenever a reply is added or removed."""
+    return f"{comment.modified.timestamp()}:{comment.reply_count}"
+
+
+def render_detail(comment, context: Context) -> SafeString:
+    """Render `comments/detail.html` for `comment`, reusing the fragment cached for
+    the same version of the comment and the same ownership state of the viewer."""
+    user = context.get("user")
+    is_owner = bool(user and user.is_authenticated and comment.author_id == user.pk)
+    key, version = card_key(comment.id, is_owner), card_version(comment)
+    cached = get_cache().get(key)
+    if cached is not None and cached[0] == version:
+        card_stats["hits"] += 1
+        html = cached[1]
+    else:
+        card_stats["misses"] += 1
+        template = context.template.engine.get_template(DETAIL)
+        html = template.render(context.new({"comment": comment, "user": user}))
+        get_cache().set(
+            key, (version, html), get_setting("COMMENTS_CARD_CACHE_TIMEOUT")
+        )
+    return mark_safe(html)
+
+
+def forget_card(comment_id: uuid.UUID):
+    """Drop the cached fragments of a comment changed or deleted, whatever their
+    version, e.g. after a `toggle_for_user()` that did not load it beforehand."""
+    get_cache().delete_many([card_key(comment_id, owner) for owner in (True, False)])
+
+
+def card_cache_stats() -> Dict[str, float]:
+    """Hit / miss counts of this process, to help size `COMMENTS_CACHE_ALIAS`."""
+    hits, misses = card_stats["hits"], card_stats["misses"]
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "ratio": hits / total if total else 0.0}
+
+
+def generation_key(content_type_id: int, object_id) -> str:
+    return f"comments:thread:{content_type_id}:{object_id}"
+
+
+def get_generation(content_type_id: int, object_id) -> str:
+    """The current generation of a target's thread; a missing (e.g. evicted)
+    generation starts afresh rather than reviving an older one."""
+    key = generation_key(content_type_id, object_id)
+    generation = get_cache().get(key)
+    if generation is None:
+        get_cache().add(key, uuid.uuid4().hex, None)
+        generation = get_cache().get(key)
+    return generation
+
+
+def bump_generations(sender, deltas, **kwargs):
+    """Receiver of `comments_changed`: every target written to starts a new thread
+    generation once the write is committed, retiring whatever was cached for it."""
+    keys = [generation_key(*target) for target in deltas]
+    transaction.on_commit(
+        lambda: get_cache().set_many({key: uuid.uuid4().hex for key in keys}, None)
+    )
+
+
+def cached_thread(content_type_id: int, object_id, render: Callable[[], str]) -> str:
+    """The anonymous (public-only) rendering of a target's thread, made by `render`
+    at most once per thread generation. It renders from the primary database: a
+    new generation starts on commit, when a replica may not have the change yet
+    and would have it cached as new."""
+    from .routers import use_primary
+
+    generation = get_generation(content_type_id, object_id)
+    page_size = get_setting("COMMENTS_PAGE_SIZE")
+    key = f"{generation_key(content_type_id, object_id)}:{generation}:{page_size}"
+    html = get_cache().get(key)
+    if html is None:
+        thread_stats["misses"] += 1
+        with use_primary():
+            html = render()
+        get_cache().set(key, html, get_setting("COMMENTS_THREAD_CACHE_TIMEOUT"))
+    else:
+        thread_stats["hits"] += 1
+    return html
@@ -0,0 +1,27 @@
+from django.conf import settings
+
+DEFAULTS = {
+    "COMMENTS_PAGE_SIZE": 20,  # cards per `list_comments` page / "load more" swap
+    "COMMENTS_CACHE_ALIAS": "default",  # key of `CACHES` used for rendered comments
+    "COMMENTS_CARD_CACHE_TIMEOUT": 60 * 60 * 24,  # seconds a rendered card is kept
+    "COMMENTS_THREAD_CACHE_TIMEOUT": 60 * 60 * 24,  # same, for anonymous threads
+    "COMMENTS_ASYNC_VIEWS": False,  # route to `async_views`, e.g. under ASGI
+    "COMMENTS_REPLY_DEPTH": 3,  # levels of replies loaded per request
+    "COMMENTS_SOFT_DELETE": False,  # deletes only hide; `purge_comments` removes rows
+    "COMMENTS_PURGE_BATCH_SIZE": 500,  # rows hard-deleted per `purge_comments` batch
+    "COMMENTS_PURGE_PAUSE": 0.5,  # seconds between two `purge_comments` batches
+    "COMMENTS_ARCHIVE_CACHE_TIMEOUT": None,  # seconds an archived thread is cached
+    "COMMENTS_STREAM_CHUNK_SIZE": 500,  # rows fetched per round trip when streaming
+    "COMMENTS_REPLICA_DATABASE": None,  # `DATABASES` alias for reads, see `routers`
+    "COMMENTS_PRIMARY_STICKY_SECONDS": 15,  # reads stay on the primary after a write
+    "COMMENTS_RATE_LIMITS": {},  # e.g. {"user": "30/m", "ip": "60/m"}, see `throttle`
+    "COMMENTS_RATE_LIMIT_BUCKETS": "comments.throttle.CacheBuckets",  # or LocalBuckets
+    "COMMENTS_INSTRUMENTATION": False,  # measure views / tags, see `instrumentation`
+    "COMMENTS_METRICS_SINKS": [],  # dotted paths of `sink(metrics, request)` callables
+}
+
+
+def get_setting(name: str):
+    """Project settings override the app `DEFAULTS`; read on every call so that
+    `override_settings` in tests takes effect."""
+    return getattr(settings, name, DEFAULTS[name])
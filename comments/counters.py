@@ -0,0 +1,77 @@
+from collections import defaultdict
+from typing import Dict, Tuple
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    IntegerField,
+    Q,
+    QuerySet,
+    Value,
+    When,
+)
+from django.db.models.functions import Greatest
+
+Deltas = Dict[Tuple[int, str], Tuple[int, int]]
+
+
+def tally(comments: QuerySet, sign: int = 1) -> Deltas:
+    """The `(total, public)` number of `comments` per target, in one grouped query;
+    negate with `sign=-1` to describe their removal."""
+    rows = (
+        comments.order_by()
+        .values("content_type_id", "object_id")
+        .annotate(total=Count("pk"), public=Count("pk", filter=Q(is_public=True)))
+    )
+    return {
+        (row["content_type_id"], row["object_id"]): (
+            sign * row["total"],
+            sign * row["public"],
+        )
+        for row in rows
+    }
+
+
+def _shift(field: str, changes: Dict[str, int]) -> Greatest:
+    whens = [When(pk=pk, then=F(field) + delta) for pk, delta in changes.items()]
+    shifted = Case(*whens, default=F(field), output_field=IntegerField())
+    return Greatest(shifted, Value(0))
+
+
+def update_counters(sender, deltas: Deltas, **kwargs):
+    """Receiver of `comments_changed`: shifts the counters of `AbstractCommentable`
+    targets with one `UPDATE` per content type, no matter how many targets or
+    comments were involved. Clamped at zero so that counters which predate the
+    comments they describe cannot make a write fail."""
+    from .models import AbstractCommentable
+
+    by_type: Dict[int, Dict[str, Tuple[int, int]]] = defaultdict(dict)
+    for (content_type_id, object_id), delta in deltas.items():
+        if any(delta):
+            by_type[content_type_id][object_id] = delta
+
+    for content_type_id, changes in by_type.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        if not model or not issubclass(model, AbstractCommentable):
+            continue
+        model._base_manager.filter(pk__in=list(changes)).update(
+            comment_count=_shift(
+                "comment_count", {pk: total for pk, (total, _) in changes.items()}
+            ),
+            public_comment_count=_shift(
+                "public_comment_count",
+                {pk: public for pk, (_, public) in changes.items()},
+            ),
+        )
+
+
+def update_reply_counts(model, changes: Dict[object, int]):
+    """Shift the `reply_count` of the comments keyed in `changes` by their value,
+    in one `UPDATE`."""
+    changes = {pk: delta for pk, delta in changes.items() if delta}
+    if changes:
+        model._base_manager.filter(pk__in=list(changes)).update(
+            reply_count=_shift("reply_count", changes)
+        )
@@ -0,0 +1,189 @@
+"""Opt-in (`COMMENTS_INSTRUMENTATION`) cost accounting of the comment views and
+template tag: SQL count and time, template render time and model rows fetched.
+
+Each measurement is sent through the `comment_metrics` signal, handed to every
+callable in `COMMENTS_METRICS_SINKS` and kept on the request for the
+`Server-Timing` header, set by instrumented views on their own response and by
+`ServerTimingMiddleware` on any page that renders `list_comments`."""
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import lru_cache, wraps
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.db.models.signals import post_init
+from django.http import HttpRequest, HttpResponse
+from django.utils.module_loading import import_string
+
+from .conf import get_setting
+from .signals import comment_metrics
+
+_active: ContextVar[Tuple["Metrics", ...]] = ContextVar("comment_metrics", default=())
+_rendering: ContextVar[bool] = ContextVar("comment_rendering", default=False)
+
+
+@dataclass
+class Metrics:
+    name: str
+    sql_count: int = 0
+    sql_ms: float = 0.0
+    render_ms: float = 0.0
+    rows: int = 0
+    total_ms: float = 0.0
+
+    @property
+    def server_timing(self) -> str:
+        desc = (
+            f"sql={self.sql_count} sql_ms={self.sql_ms:.2f}"
+            f" render_ms={self.render_ms:.2f} rows={self.rows}"
+        )
+        return f'{self.name};dur={self.total_ms:.2f};desc="{desc}"'
+
+
+def _count_sql(execute, sql, params, many, context):
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = (time.perf_counter() - start) * 1_000
+        for metrics in _active.get():
+            metrics.sql_count += 1
+            metrics.sql_ms += elapsed
+
+
+def _wrap_connections():
+    """Count SQL on every database alias of this thread, e.g. the primary and a
+    read replica, see `comments.routers`. Installed once per connection and left
+    in place: it only counts for measurements active in the calling context."""
+    for conn in connections.all():
+        if _count_sql not in conn.execute_wrappers:
+            conn.execute_wrappers.append(_count_sql)
+
+
+def _count_row(sender, instance, **kwargs):
+    for metrics in _active.get():
+        metrics.rows += 1
+
+
+@lru_cache(maxsize=None)
+def _sinks(paths: Tuple[str, ...]) -> List[Callable]:
+    return [import_string(path) for path in paths]
+
+
+@contextmanager
+def instrument(name: str, request: Optional[HttpRequest] = None) -> Iterator:
+    """Measure the block as `name`; yields the `Metrics`, or None when off.
+    Blocks may nest, e.g. the tag within a view, each counting its own share."""
+    if not get_setting("COMMENTS_INSTRUMENTATION"):
+        yield None
+        return
+
+    metrics = Metrics(name)
+    # connected on first use only: Django skips `post_init` for receiver-less models
+    post_init.connect(_count_row, dispatch_uid="comment_metrics_rows")
+    token = _active.set(_active.get() + (metrics,))
+    start = time.perf_counter()
+    try:
+        _wrap_connections()
+        yield metrics
+    finally:
+        metrics.total_ms = (time.perf_counter() - start) * 1_000
+        _active.reset(token)
+        _publish(metrics, request)
+
+
+@contextmanager
+def rendering() -> Iterator:
+    """Attribute the block to the render time of every active measurement, once
+    if nested, e.g. `list_comments` within the template of an instrumented view."""
+    if _rendering.get():
+        yield
+        return
+    token = _rendering.set(True)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1_000
+        _rendering.reset(token)
+        for metrics in _active.get():
+            metrics.render_ms += elapsed
+
+
+def _publish(metrics: Metrics, request: Optional[HttpRequest]):
+    if request is not None:
+        if not hasattr(request, "comment_metrics"):
+            request.comment_metrics = []
+        request.comment_metrics.append(metrics)
+    comment_metrics.send(sender=metrics.name, metrics=metrics, request=request)
+    for sink in _sinks(tuple(get_setting("COMMENTS_METRICS_SINKS"))):
+        sink(metrics, request)
+
+
+def set_server_timing(request: HttpRequest, response: HttpResponse):
+    if recorded := getattr(request, "comment_metrics", None):
+        response.headers["Server-Timing"] = ", ".join(
+            metrics.server_timing for metrics in recorded
+        )
+
+
+def instrumented(name: str):
+    """Measure a sync or async view, or any callable taking the request among its
+    arguments, including rendering its `TemplateResponse` which is otherwise
+    deferred."""
+
+    def decorator(func: Callable[..., HttpResponse]):
+        if asyncio.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs) -> HttpResponse:
+                if not get_setting("COMMENTS_INSTRUMENTATION"):
+                    return await func(*args, **kwargs)
+                request = next((a for a in args if isinstance(a, HttpRequest)), None)
+                # the ORM of async code runs in the thread of `sync_to_async()`
+                await sync_to_async(_wrap_connections)()
+                with instrument(name, request):
+                    response = await func(*args, **kwargs)
+                    if callable(getattr(response, "render", None)):
+                        with rendering():
+                            await sync_to_async(response.render)()
+                if request is not None:
+                    set_server_timing(request, response)
+                return response
+
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs) -> HttpResponse:
+            if not get_setting("COMMENTS_INSTRUMENTATION"):
+                return func(*args, **kwargs)
+            request = next((a for a in args if isinstance(a, HttpRequest)), None)
+            with instrument(name, request):
+                response = func(*args, **kwargs)
+                if callable(getattr(response, "render", None)):
+                    with rendering():
+                        response.render()
+            if request is not None:
+                set_server_timing(request, response)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+class ServerTimingMiddleware:
+    """Adds the `Server-Timing` header for whatever comment code a page ran, e.g.
+    `list_comments` within a view of another app."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        response = self.get_response(request)
+        set_server_timing(request, response)
+        return response
@@ -0,0 +1,65 @@
+import time
+from datetime import timedelta
+from itertools import chain
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.timezone import now
+
+from comments.archive import archive, closed_threads, stale_threads
+from comments.transfer import throughput
+
+
+class Command(BaseCommand):
+    help = (
+        "Move whole threads out of the live comment table into the archive: those"
+        " without a comment written in --older-than days, and / or those of targets"
+        " closed for comments."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than",
+            type=float,
+            metavar="DAYS",
+            help="Archive threads without a comment written in this many days",
+        )
+        parser.add_argument(
+            "--closed",
+            action="store_true",
+            help="Archive the threads of targets in `closed_for_comments()`",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Comments archived per transaction, in whole threads",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.5,
+            help="Seconds to wait between two batches",
+        )
+
+    def handle(self, *args, older_than, closed, batch_size, pause, **options):
+        if older_than is None and not closed:
+            raise CommandError("Pass --older-than and / or --closed")
+        # closed threads go whatever their age; stale ones only while still stale
+        batches, closed_keys = [], set()
+        if closed:
+            rows = list(closed_threads())
+            closed_keys = {(ct, pk) for ct, pk, _ in rows}
+            batches.append(archive(rows, batch_size, pause))
+        if older_than is not None:
+            before = now() - timedelta(days=older_than)
+            rows = [
+                row
+                for row in stale_threads(before)
+                if tuple(row[:2]) not in closed_keys
+            ]
+            batches.append(archive(rows, batch_size, pause, before))
+        started, count = time.monotonic(), 0
+        for archived in chain.from_iterable(batches):
+            count += archived
+            self.stderr.write(throughput(count, started), ending="\r")
+        self.stdout.write(f"Archived {throughput(count, started)}")
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from comments.conf import get_setting
+from comments.models import Comment
+from comments.transfer import dump, throughput
+
+
+class Command(BaseCommand):
+    help = "Write comments as JSON Lines, streamed from a server-side cursor."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", nargs="?", default="-", help="File to write, - for stdout"
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=get_setting("COMMENTS_STREAM_CHUNK_SIZE"),
+            help="Rows fetched from the database at a time",
+        )
+        parser.add_argument(
+            "--include-deleted",
+            action="store_true",
+            help="Also write soft-deleted comments",
+        )
+
+    def handle(self, *args, path, chunk_size, include_deleted, **options):
+        manager = Comment.all_objects if include_deleted else Comment.objects
+        out = self.stdout if path == "-" else open(path, "w", encoding="utf-8")
+        started, count = time.monotonic(), 0
+        try:
+            for count, line in enumerate(dump(manager.all(), chunk_size), 1):
+                out.write(line)
+                if not count % chunk_size:
+                    self.stderr.write(throughput(count, started), ending="\r")
+        finally:
+            if out is not self.stdout:
+                out.close()
+        self.stderr.write(f"Exported {throughput(count, started)}")
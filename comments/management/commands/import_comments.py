@@ -0,0 +1,43 @@
+import sys
+import time
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand
+
+from comments.transfer import deferred_indexes, load, throughput
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert comments from JSON Lines, as written by export_comments, in"
+        " batches of bulk inserts that keep counters consistent."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", nargs="?", default="-", help="File to read, - for stdin"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Comments inserted per transaction",
+        )
+        parser.add_argument(
+            "--defer-indexes",
+            action="store_true",
+            help="Drop the comment indexes during the import, rebuild them after",
+        )
+
+    def handle(self, *args, path, batch_size, defer_indexes, **options):
+        source = sys.stdin if path == "-" else open(path, encoding="utf-8")
+        started, count = time.monotonic(), 0
+        try:
+            with deferred_indexes() if defer_indexes else nullcontext():
+                for inserted in load(source, batch_size):
+                    count += inserted
+                    self.stderr.write(throughput(count, started), ending="\r")
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        self.stderr.write(f"Imported {throughput(count, started)}")
@@ -0,0 +1,54 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.timezone import now
+
+from comments.conf import get_setting
+from comments.models import Comment
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the rows of soft-deleted comments for good, a bounded batch at a"
+        " time with a pause in between, so the table stays available to writers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=get_setting("COMMENTS_PURGE_BATCH_SIZE"),
+            help="Comments deleted per transaction",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=get_setting("COMMENTS_PURGE_PAUSE"),
+            help="Seconds to wait between two batches",
+        )
+        parser.add_argument(
+            "--older-than",
+            type=float,
+            default=0,
+            metavar="HOURS",
+            help="Only purge comments soft-deleted at least this long ago",
+        )
+
+    def handle(self, *args, batch_size, pause, older_than, **options):
+        doomed = Comment.all_objects.filter(
+            deleted_at__lte=now() - timedelta(hours=older_than)
+        ).order_by("deleted_at")
+        purged = 0
+        while True:
+            with transaction.atomic():
+                pks = list(doomed.values_list("pk", flat=True)[:batch_size])
+                if not pks:
+                    break
+                # replies soft-deleted with a purged comment go with it, by cascade
+                purged += Comment.all_objects.filter(pk__in=pks).purge()
+            if len(pks) < batch_size:
+                break
+            time.sleep(pause)
+        self.stdout.write(f"{purged} comments purged")
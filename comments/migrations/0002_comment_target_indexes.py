@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("comments", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["content_type", "object_id", "-modified", "-created"],
+                name="comment_target_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                condition=models.Q(("is_public", True)),
+                fields=["content_type", "object_id", "-modified", "-created"],
+                name="comment_target_public_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                condition=models.Q(("is_public", False)),
+                fields=["author", "content_type", "object_id", "-modified"],
+                name="comment_target_author_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,13 @@
+from django.db import migrations
+
+from comments.search import install_search, uninstall_search
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("comments", "0002_comment_target_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search, uninstall_search),
+    ]
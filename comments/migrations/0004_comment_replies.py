@@ -0,0 +1,65 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+import comments.models
+from comments.search import install_search
+
+
+def backfill_paths(apps, schema_editor):
+    """Existing comments are all top level; the column default gave each the same
+    path, so give every one its own."""
+    Comment = apps.get_model("comments", "Comment")
+    batch = []
+    for comment in Comment.objects.only("pk", "created").iterator(chunk_size=1000):
+        comment.path = comments.models.path_segment(comment.created, comment.pk.int)
+        batch.append(comment)
+        if len(batch) == 1000:
+            Comment.objects.bulk_update(batch, ["path"])
+            batch = []
+    Comment.objects.bulk_update(batch, ["path"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("comments", "0003_comment_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="depth",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="parent",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="replies",
+                to="comments.comment",
+            ),
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="path",
+            field=models.CharField(
+                default=comments.models.path_segment, editable=False, max_length=255
+            ),
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="reply_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(fields=["path"], name="comment_path_idx"),
+        ),
+        migrations.RunPython(backfill_paths, migrations.RunPython.noop),
+        # SQLite remade the table for the foreign key, dropping the search triggers
+        migrations.RunPython(install_search, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:14
+
+from django.core.exceptions import ValidationError
+from django.db import migrations, models
+
+import comments.models
+
+
+def backfill_object_pks(apps, schema_editor):
+    """Typed copies of `object_id`, for targets whose pk is an integer or a uuid."""
+    Comment = apps.get_model("comments", "Comment")
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    rows = Comment.objects.using(schema_editor.connection.alias)
+    targets = ContentType.objects.using(schema_editor.connection.alias).filter(
+        pk__in=rows.values("content_type")
+    )
+    for ct in targets:
+        try:
+            model = apps.get_model(ct.app_label, ct.model)
+        except LookupError:  # model since removed
+            continue
+        field = comments.models.object_pk_field(model)
+        if field == "object_id":
+            continue
+        to_python, batch = Comment._meta.get_field(field).to_python, []
+        for comment in (
+            rows.filter(content_type=ct)
+            .only("pk", "object_id")
+            .iterator(chunk_size=1000)
+        ):
+            try:
+                setattr(comment, field, to_python(comment.object_id))
+            except ValidationError:  # not a pk of `model`, left without a typed one
+                continue
+            batch.append(comment)
+            if len(batch) == 1000:
+                rows.bulk_update(batch, [field])
+                batch = []
+        rows.bulk_update(batch, [field])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("comments", "0006_archived_comment"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="object_pk_int",
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="object_pk_uuid",
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_object_pks, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                condition=models.Q(("object_pk_int__isnull", False)),
+                fields=["content_type", "object_pk_int", "-modified", "-created"],
+                name="comment_target_int_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                condition=models.Q(("object_pk_uuid__isnull", False)),
+                fields=["content_type", "object_pk_uuid", "-modified", "-created"],
+                name="comment_target_uuid_idx",
+            ),
+        ),
+    ]
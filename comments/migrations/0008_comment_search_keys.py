@@ -0,0 +1,14 @@
+from django.db import migrations
+
+from comments.search import install_search
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("comments", "0007_comment_typed_object_pk"),
+    ]
+
+    operations = [
+        # SQLite: FTS5 rows keyed on comment ids rather than on implicit rowids
+        migrations.RunPython(install_search, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("comments", "0008_comment_search_keys"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="comment",
+            name="comment_target_public_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="comment",
+            name="comment_target_author_idx",
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                condition=models.Q(
+                    ("is_public", True), ("object_pk_int__isnull", False)
+                ),
+                fields=["content_type", "object_pk_int", "-modified", "-created"],
+                name="comment_target_int_public_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                condition=models.Q(
+                    ("is_public", False), ("object_pk_int__isnull", False)
+                ),
+                fields=["author", "content_type", "object_pk_int", "-modified"],
+                name="comment_target_int_author_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                condition=models.Q(
+                    ("is_public", True), ("object_pk_uuid__isnull", False)
+                ),
+                fields=["content_type", "object_pk_uuid", "-modified", "-created"],
+                name="comment_target_uuid_public_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                condition=models.Q(
+                    ("is_public", False), ("object_pk_uuid__isnull", False)
+                ),
+                fields=["author", "content_type", "object_pk_uuid", "-modified"],
+                name="comment_target_uuid_author_idx",
+            ),
+        ),
+    ]
@@ -1,24 +1,347 @@
+import secrets
 import uuid
-from typing import Callable, Union
+import warnings
+from collections import Counter, defaultdict
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple, Union
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.fields import (
     GenericForeignKey,
     GenericRelation,
+    ReverseGenericManyToOneDescriptor,
 )
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import PermissionDenied
-from django.db import models
+from django.db import connections, models, transaction
+from django.db.models.expressions import RawSQL, Window
+from django.db.models.functions import Concat, RowNumber
+from django.http import Http404
 from django.http.request import HttpRequest
 from django.http.response import HttpResponseRedirect
-from django.shortcuts import get_object_or_404, redirect
 from django.template.response import TemplateResponse
-from django.urls import path, reverse
+from django.urls import get_script_prefix, get_urlconf, path, reverse
 from django.urls.resolvers import URLPattern
-from django.utils.functional import classproperty
+from django.utils.functional import cached_property, classproperty
+from django.utils.timezone import now
 from django_extensions.db.models import TimeStampedModel
 
+from . import search
+from .conf import get_setting
+from .counters import tally, update_reply_counts
+from .instrumentation import instrumented
+from .signals import comments_changed
+from .throttle import throttled
+
+_PLACEHOLDER = uuid.UUID(int=0)
+
+
+@lru_cache(maxsize=None)
+def _url_parts(name: str, urlconf: str, script_prefix: str) -> Tuple[str, str]:
+    url = reverse(name, kwargs={"id": _PLACEHOLDER}, urlconf=urlconf)
+    head, _, tail = url.partition(str(_PLACEHOLDER))
+    return head, tail
+
+
+def comment_url(name: str, id: uuid.UUID) -> str:
+    """`reverse(f"comments:{name}", kwargs={"id": id})` without resolving per call:
+    the route is reversed once per urlconf and script prefix, then joined with `id`.
+    Every card of a thread links to three of these."""
+    urlconf = get_urlconf() or settings.ROOT_URLCONF
+    head, tail = _url_parts(f"comments:{name}", urlconf, get_script_prefix())
+    return f"{head}{id}{tail}"
+
+
+SEGMENT = 16
+"""Characters per comment in `Comment.path`: 13 hex digits of microseconds since
+the epoch, so that replies sort by age, then 3 random ones against ties."""
+MAX_DEPTH = 255 // SEGMENT
+SUBTREE_END = "g"  # sorts after every hex digit, i.e. after every descendant path
+
+
+def path_segment(at: Optional[datetime] = None, salt: Optional[int] = None) -> str:
+    micros = int((at or now()).timestamp() * 1_000_000)
+    salt = secrets.randbits(12) if salt is None else salt % 4096
+    return f"{micros:013x}{salt:03x}"
+
+
+TYPED_OBJECT_PKS = ("object_pk_int", "object_pk_uuid")
+
+
+def object_pk_field(model) -> str:
+    """The `Comment` column holding pks of `model` natively: `object_pk_int` or
+    `object_pk_uuid`, or `object_id` for other pk types. Until Django adds the
+    implicit pk of `model` (while its fields are contributed), the type is that of
+    its default auto field."""
+    pk = model._meta.pk
+    if pk is None:
+        kind = model._meta._get_default_pk_class()
+    else:
+        while pk.is_relation:
+            pk = pk.target_field
+        kind = type(pk)
+    if issubclass(kind, models.IntegerField):
+        return "object_pk_int"
+    if issubclass(kind, models.UUIDField):
+        return "object_pk_uuid"
+    return "object_id"
+
+
+COUNTERS = frozenset({"comment_count", "public_comment_count"})
+PREFETCHED = "visible_comments"
+
+
+class ThreadQuerySet(models.QuerySet):
+    """Reads shared by live and archived comments."""
+
+    def visible_to(self, user) -> "ThreadQuerySet":
+        """Public comments, and if authenticated, the `user`'s own private ones."""
+        if user is not None and user.is_authenticated:
+            return self.filter(models.Q(is_public=True) | models.Q(author=user))
+        return self.filter(is_public=True)
+
+    def for_target(self, content_type_id: int, object_id) -> "ThreadQuerySet":
+        return self.filter(content_type_id=content_type_id, object_id=str(object_id))
+
+
+class CommentQuerySet(ThreadQuerySet):
+    # Replies: each comment's `path` is its parent's path plus a segment of its
+    # own, so a subtree is a range of paths, already in thread order. Ranges
+    # rather than `startswith`, which SQLite's case-insensitive `LIKE` cannot
+    # serve from the index.
+
+    def top_level(self) -> "CommentQuerySet":
+        return self.filter(depth=0)
+
+    def subtree(self, root: "Comment", depth: Optional[int] = None):
+        """Replies to `root`, to theirs and so on, `depth` levels deep if given,
+        in one query ordered depth-first with siblings oldest first."""
+        qs = self.filter(path__gt=root.path, path__lt=root.path + SUBTREE_END)
+        if depth is not None:
+            qs = qs.filter(depth__lte=root.depth + depth)
+        return qs.order_by("path")
+
+    def with_descendants(self) -> "CommentQuerySet":
+        """These comments and all the replies below them. The subtrees are a join
+        of the roots against the index on `path`, one range per root row, so the
+        statement stays the same size however many roots there are."""
+        roots = (
+            self.filter(reply_count__gt=0)
+            .order_by()
+            .values(
+                root=models.F("path"),
+                # concatenated per backend: `||` is a logical OR on MySQL
+                bound=Concat("path", models.Value(SUBTREE_END)),
+            )
+        )
+        sql, params = roots.query.get_compiler(self.db).as_sql()
+        table = connections[self.db].ops.quote_name(self.model._meta.db_table)
+        below = RawSQL(
+            (
+                f"SELECT reply.id FROM {table} reply INNER JOIN ({sql}) roots"
+                " ON reply.path > roots.root AND reply.path < roots.bound"
+            ),
+            params,
+        )
+        return self.model.objects.filter(
+            models.Q(pk__in=self.values("pk")) | models.Q(pk__in=below)
+        )
+
+    def for_cards(self) -> "CommentQuerySet":
+        """Joins the author and loads only the columns `comments/card.html` reads,
+        so rendering a thread costs one query regardless of its length."""
+        return self.select_related("author").only(
+            "id",
+            "content",
+            "is_public",
+            "created",
+            "modified",
+            "author_id",
+            "content_type_id",  # to match prefetched comments with their targets
+            "object_id",
+            "object_pk_int",
+            "object_pk_uuid",
+            "parent_id",
+            "path",
+            "depth",
+            "reply_count",
+            f"author__{get_user_model().USERNAME_FIELD}",
+        )
+
+    def search(self, terms: str) -> "CommentQuerySet":
+        """Comments whose content matches `terms`, through the full-text index of
+        the database, see `comments.search`."""
+        return search.search(self, terms)
+
+    def delete(self):
+        """Same as `QuerySet.delete()`, replies included, but the removed comments
+        are first tallied so that `comments_changed` can be sent, e.g. for the
+        target counters, and the reply counts of surviving parents kept."""
+        with transaction.atomic(using=self.db):
+            deltas = tally(self.with_descendants(), sign=-1)
+            parents = Counter(
+                self.exclude(parent=None).values_list("parent_id", flat=True)
+            )
+            result = super().delete()
+            update_reply_counts(self.model, {pk: -n for pk, n in parents.items()})
+            comments_changed.send(sender=self.model, deltas=deltas)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    # Bulk operations: a constant number of queries however many comments or
+    # targets are involved, with `comments_changed` keeping derived state in step.
+
+    def for_objects(self, targets) -> "CommentQuerySet":
+        """Comments on any of `targets`, which may mix commentable models."""
+        object_ids = defaultdict(list)
+        for target in targets:
+            ct = ContentType.objects.get_for_model(target)
+            object_ids[ct.id].append(str(target.pk))
+        condition = models.Q(pk__in=[])
+        for content_type_id, ids in object_ids.items():
+            condition |= models.Q(content_type_id=content_type_id, object_id__in=ids)
+        return self.filter(condition)
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """Fills the typed target pk of each comment first, as `save()` does."""
+        objs = list(objs)
+        for obj in objs:
+            obj._sync_object_pk()
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def create_for_objects(
+        self, targets, author, content: str, is_public: bool = False, batch_size=None
+    ) -> List["Comment"]:
+        """The same comment by `author` on each of `targets`, via `bulk_create()`."""
+        comments = [
+            self.model(
+                content=content,
+                is_public=is_public,
+                author=author,
+                content_type=ContentType.objects.get_for_model(target),
+                object_id=str(target.pk),
+            )
+            for target in targets
+        ]
+        deltas = Counter()
+        for comment in comments:
+            deltas[comment._target_key] += 1
+        with transaction.atomic(using=self.db):
+            created = self.bulk_create(comments, batch_size=batch_size)
+            comments_changed.send(
+                sender=self.model,
+                deltas={k: (n, n * is_public) for k, n in deltas.items()},
+            )
+        return created
+
+    def set_public(self, is_public: bool) -> int:
+        """Make the comments public (or private), returning how many changed."""
+        changing = self.exclude(is_public=is_public)
+        with transaction.atomic(using=self.db):
+            deltas = tally(changing, sign=1 if is_public else -1)
+            updated = changing.update(is_public=is_public, modified=now())
+            comments_changed.send(
+                sender=self.model,
+                deltas={k: (0, total) for k, (total, _) in deltas.items()},
+            )
+        return updated
+
+    set_public.alters_data = True
+
+    # Mutations by the author: ownership is part of the `WHERE` clause, so an
+    # allowed mutation costs no read beforehand. Only when nothing matched is the
+    # row looked up, to tell a missing comment (404) from someone else's (403).
+
+    def owned_by(self, id: uuid.UUID, user) -> "CommentQuerySet":
+        return self.filter(id=id, author_id=user.pk)
+
+    def _refuse(self, id: uuid.UUID):
+        if self.filter(id=id).exists():
+            raise PermissionDenied()
+        raise Http404(f"No comment {id}")
+
+    def get_for_user(self, id: uuid.UUID, user) -> "Comment":
+        comment = self.owned_by(id, user).first()
+        if comment is None:
+            self._refuse(id)
+        return comment
+
+    def toggle_for_user(self, id: uuid.UUID, user) -> "Comment":
+        """Flip `is_public` with a single atomic `UPDATE ... SET is_public = NOT
+        is_public`, so concurrent toggles cannot lose one another. Returns the
+        comment as updated, author joined for rendering."""
+        flipped = models.Case(
+            models.When(is_public=True, then=models.Value(False)),
+            default=models.Value(True),
+        )
+        with transaction.atomic(using=self.db):
+            if not self.owned_by(id, user).update(is_public=flipped, modified=now()):
+                self._refuse(id)
+            comment = self.select_related("author").get(id=id)
+            comments_changed.send(
+                sender=self.model,
+                deltas={comment._target_key: (0, 1 if comment.is_public else -1)},
+            )
+        return comment
+
+    def delete_for_user(self, id: uuid.UUID, user) -> int:
+        with transaction.atomic(using=self.db):
+            deleted = self.owned_by(id, user).discard()
+            if not deleted:
+                self._refuse(id)
+        return deleted
+
+    # Soft delete: with `COMMENTS_SOFT_DELETE`, removing comments only stamps
+    # `deleted_at`, which `Comment.objects` filters out, and `purge_comments`
+    # deletes the rows later, in batches, off the request path.
+
+    def discard(self) -> int:
+        """`soft_delete()` or `delete()` these comments, per `COMMENTS_SOFT_DELETE`.
+        Returns how many comments were removed, replies included."""
+        if get_setting("COMMENTS_SOFT_DELETE"):
+            return self.soft_delete()
+        deleted, _ = self.delete()
+        return deleted
+
+    discard.alters_data = True
+
+    def soft_delete(self) -> int:
+        """Stamp these comments and their replies as deleted, in one `UPDATE`;
+        counters and reply counts follow right away, as for `delete()`."""
+        with transaction.atomic(using=self.db):
+            doomed = self.with_descendants()
+            deltas = tally(doomed, sign=-1)
+            parents = Counter(
+                self.exclude(parent=None).values_list("parent_id", flat=True)
+            )
+            deleted = doomed.update(deleted_at=now())
+            update_reply_counts(self.model, {pk: -n for pk, n in parents.items()})
+            comments_changed.send(sender=self.model, deltas=deltas)
+        return deleted
+
+    soft_delete.alters_data = True
+
+    def purge(self) -> int:
+        """Delete the rows of soft-deleted comments for good. Unlike `delete()`,
+        nothing is tallied: they left the counters when they were soft-deleted."""
+        deleted, _ = models.QuerySet.delete(self.exclude(deleted_at=None))
+        return deleted
+
+    purge.alters_data = True
+    purge.queryset_only = True
+
+
+class LiveCommentManager(models.Manager):
+    """Leaves out soft-deleted comments, see `CommentQuerySet.soft_delete()`."""
+
+    def get_queryset(self) -> CommentQuerySet:
+        return super().get_queryset().filter(deleted_at=None)
+
 
 class Comment(TimeStampedModel):
     """The `AbstractCommentable` model has a comments field which map to this model."""
@@ -37,66 +360,391 @@ class Comment(TimeStampedModel):
     content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
     object_id = models.CharField(max_length=255)  #
     content_object = GenericForeignKey("content_type", "object_id")
+    # the same pk, typed, for whichever of these the target's pk is, so that the
+    # target's `comments` relation compares and joins on native keys
+    object_pk_int = models.BigIntegerField(null=True, blank=True, editable=False)
+    object_pk_uuid = models.UUIDField(null=True, blank=True, editable=False)
+
+    # replies, see `CommentQuerySet.subtree()`
+    parent = models.ForeignKey(
+        "self", null=True, blank=True, on_delete=models.CASCADE, related_name="replies"
+    )
+    path = models.CharField(max_length=255, default=path_segment, editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    reply_count = models.PositiveIntegerField(default=0, editable=False)
+
+    # set by `CommentQuerySet.soft_delete()`, see `COMMENTS_SOFT_DELETE`
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = LiveCommentManager.from_queryset(CommentQuerySet)()
+    all_objects = CommentQuerySet.as_manager()  # soft-deleted included
 
     class Meta:
         ordering = ["-modified", "-created"]
+        indexes = [
+            # thread lookup by `object_id`: `for_target()`, and targets whose pk is
+            # neither an integer nor a uuid
+            models.Index(
+                fields=["content_type", "object_id", "-modified", "-created"],
+                name="comment_target_idx",
+            ),
+            # thread lookup via `AbstractCommentable.comments`, by typed pk,
+            # presorted; then per branch of the visibility filter: `is_public=True`,
+            # and `author=user`, i.e. own private ones
+            models.Index(
+                fields=["content_type", "object_pk_int", "-modified", "-created"],
+                name="comment_target_int_idx",
+                condition=models.Q(object_pk_int__isnull=False),
+            ),
+            models.Index(
+                fields=["content_type", "object_pk_int", "-modified", "-created"],
+                name="comment_target_int_public_idx",
+                condition=models.Q(is_public=True, object_pk_int__isnull=False),
+            ),
+            models.Index(
+                fields=["author", "content_type", "object_pk_int", "-modified"],
+                name="comment_target_int_author_idx",
+                condition=models.Q(is_public=False, object_pk_int__isnull=False),
+            ),
+            models.Index(
+                fields=["content_type", "object_pk_uuid", "-modified", "-created"],
+                name="comment_target_uuid_idx",
+                condition=models.Q(object_pk_uuid__isnull=False),
+            ),
+            models.Index(
+                fields=["content_type", "object_pk_uuid", "-modified", "-created"],
+                name="comment_target_uuid_public_idx",
+                condition=models.Q(is_public=True, object_pk_uuid__isnull=False),
+            ),
+            models.Index(
+                fields=["author", "content_type", "object_pk_uuid", "-modified"],
+                name="comment_target_uuid_author_idx",
+                condition=models.Q(is_public=False, object_pk_uuid__isnull=False),
+            ),
+            models.Index(fields=["path"], name="comment_path_idx"),
+            # soft-deleted comments awaiting `purge_comments`
+            models.Index(
+                fields=["deleted_at"],
+                name="comment_deleted_idx",
+                condition=models.Q(deleted_at__isnull=False),
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_is_public = instance.__dict__.get("is_public")
+        instance._loaded_object_pks = {
+            field: instance.__dict__.get(field) for field in TYPED_OBJECT_PKS
+        }
+        return instance
 
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
+        adding, update_fields = self._state.adding, kwargs.get("update_fields")
+        with transaction.atomic(using=kwargs.get("using")):
+            if adding and self.parent_id:
+                self._place_reply()
+            self._sync_object_pk()
+            super().save(*args, **kwargs)
+            if adding:
+                if self.parent_id:
+                    update_reply_counts(self.__class__, {self.parent_id: 1})
+                delta = (1, int(self.is_public))
+            elif update_fields is None or "is_public" in update_fields:
+                was_public = getattr(self, "_loaded_is_public", None)
+                flip = self.is_public - was_public if was_public is not None else 0
+                delta = (0, flip)
+            else:
+                delta = (0, 0)
+            comments_changed.send(
+                sender=self.__class__, deltas={self._target_key: delta}
+            )
+        self._loaded_is_public = self.is_public
+        self._loaded_object_pks = {
+            field: self.__dict__.get(field) for field in TYPED_OBJECT_PKS
+        }
+
+    def _sync_object_pk(self):
+        """Fills the typed column of the target's pk from `object_id`, or the other
+        way round when only the former was set, e.g. by `target.comments.create()`,
+        or was changed since the comment was loaded."""
+        model = ContentType.objects.get_for_id(self.content_type_id).model_class()
+        field = object_pk_field(model) if model else "object_id"
+        if field == "object_id":
+            return
+        typed = getattr(self, field)
+        loaded = getattr(self, "_loaded_object_pks", {}).get(field, typed)
+        if typed is not None and (not self.object_id or typed != loaded):
+            self.object_id = str(typed)
+        else:
+            setattr(self, field, self._meta.get_field(field).to_python(self.object_id))
+
+    def _place_reply(self):
+        """Under the parent's path, on the parent's target. Past `MAX_DEPTH`, the
+        reply goes next to its parent instead."""
+        parent = self.parent
+        if parent.depth + 1 >= MAX_DEPTH:
+            parent = self.parent = parent.parent
+        self.path = parent.path + self.path[-SEGMENT:]
+        self.depth = parent.depth + 1
+        self.content_type_id, self.object_id = parent.content_type_id, parent.object_id
+
+    def delete(self, *args, **kwargs):
+        """Replies go with the comment, the cascade being tallied beforehand."""
+        with transaction.atomic(using=kwargs.get("using")):
+            if self.reply_count:
+                subtree = self.__class__.objects.filter(
+                    path__gte=self.path, path__lt=self.path + SUBTREE_END
+                )
+                deltas = tally(subtree, sign=-1)
+            else:
+                deltas = {self._target_key: (-1, -int(self.is_public))}
+            result = super().delete(*args, **kwargs)
+            if self.parent_id:
+                update_reply_counts(self.__class__, {self.parent_id: -1})
+            comments_changed.send(sender=self.__class__, deltas=deltas)
+        return result
+
+    @property
+    def _target_key(self):
+        return (self.content_type_id, str(self.object_id))
 
     def get_absolute_url(self):
-        return reverse("comments:hx_view_comment", kwargs={"id": self.id})
+        return comment_url("hx_view_comment", self.id)
+
+    @property
+    def edit_url(self) -> str:
+        return comment_url("hx_edit_comment", self.id)
+
+    @property
+    def delete_url(self) -> str:
+        return comment_url("hx_del_comment", self.id)
+
+    @property
+    def toggle_url(self) -> str:
+        return comment_url("hx_toggle_comment", self.id)
+
+    @property
+    def reply_url(self) -> str:
+        return comment_url("hx_reply_comment", self.id)
+
+    @property
+    def replies_url(self) -> str:
+        return comment_url("hx_list_replies", self.id)
 
     @classmethod
     def get_for_user(cls, id: uuid.UUID, user):
-        """Simple permission checking"""
-        comment = get_object_or_404(cls, id=id)
-        if comment.author != user:
-            raise PermissionDenied()
-        return comment
+        """Simple permission checking, see `CommentQuerySet.get_for_user()`"""
+        return cls.objects.get_for_user(id, user)
+
+    @classmethod
+    async def aget_for_user(cls, id: uuid.UUID, user):
+        """Async `get_for_user()`"""
+        return await sync_to_async(cls.objects.get_for_user)(id, user)
+
+
+class ArchivedComment(models.Model):
+    """A comment moved out of `Comment`, with its whole thread, by
+    `archive_comments`: never written to again, read through `comments.archive`."""
+
+    id = models.UUIDField(primary_key=True)
+    content = models.TextField()
+    is_public = models.BooleanField()
+    author = models.ForeignKey(
+        get_user_model(), on_delete=models.PROTECT, related_name="archived_comments"
+    )
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.CharField(max_length=255)
+    content_object = GenericForeignKey("content_type", "object_id")
+    parent = models.ForeignKey(
+        "self", null=True, on_delete=models.CASCADE, related_name="replies"
+    )
+    path = models.CharField(max_length=255)
+    depth = models.PositiveSmallIntegerField()
+    reply_count = models.PositiveIntegerField()
+    created = models.DateTimeField()
+    modified = models.DateTimeField()
+    archived_at = models.DateTimeField(default=now)
+
+    objects = ThreadQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # a whole archived thread, in thread order
+            models.Index(
+                fields=["content_type", "object_id", "path"],
+                name="archived_target_idx",
+            ),
+        ]
+
+
+class CommentableQuerySet(models.QuerySet):
+    def with_comment_counts(self) -> "CommentableQuerySet":
+        """The comment counters of every target in the same query as the targets,
+        i.e. undoes any `defer()` / `only()` that left the counters out."""
+        qs = self._chain()
+        fields, defer = qs.query.deferred_loading
+        if defer:
+            qs.query.deferred_loading = (fields.difference(COUNTERS), True)
+        else:
+            qs.query.deferred_loading = (fields.union(COUNTERS), False)
+        return qs
+
+    def prefetch_visible_comments(self, user) -> "CommentableQuerySet":
+        """For pages that call `{% list_comments %}` on many targets: the first page
+        of each target's thread as visible to `user`, for all targets in a single
+        query. A `ROW_NUMBER()` window per target keeps `COMMENTS_PAGE_SIZE` rows of
+        each, plus one to tell if there is a next page. `list_comments` renders
+        from these instead of querying."""
+        from .pagination import PAGE_ORDER
+
+        limit = get_setting("COMMENTS_PAGE_SIZE")
+        rank = Window(
+            RowNumber(),
+            partition_by=[models.F("content_type"), models.F("object_id")],
+            order_by=[
+                models.F(field[1:]).desc() if field[0] == "-" else models.F(field)
+                for field in PAGE_ORDER
+            ],
+        )
+        comments = (
+            Comment.objects.visible_to(user)
+            .top_level()
+            .for_cards()
+            .annotate(thread_rank=rank)
+            .filter(thread_rank__lte=limit + 1)
+            .order_by(*PAGE_ORDER)
+        )
+        return self.prefetch_related(
+            models.Prefetch("comments", queryset=comments, to_attr=PREFETCHED)
+        )
+
+    def recount_comments(self) -> int:
+        """Recompute the counters of the targets from `Comment`, e.g. after the
+        counters were added to a model that already had comments.
+
+        Returns:
+            int: Number of targets updated.
+        """
+        pks = [str(pk) for pk in self.values_list("pk", flat=True)]
+        if not pks:
+            return 0
+        ct = ContentType.objects.get_for_model(self.model)
+        counts = {}  # archived comments count too, see `comments.archive`
+        for comments in (Comment.objects, ArchivedComment.objects):
+            tallied = tally(comments.filter(content_type=ct, object_id__in=pks))
+            for target, (total, public) in tallied.items():
+                before_total, before_public = counts.get(target, (0, 0))
+                counts[target] = (before_total + total, before_public + public)
+
+        def absolute(idx: int) -> models.Case:
+            whens = [
+                models.When(pk=object_id, then=models.Value(delta[idx]))
+                for (_, object_id), delta in counts.items()
+            ]
+            return models.Case(*whens, default=models.Value(0))
+
+        return self.model._base_manager.filter(pk__in=pks).update(
+            comment_count=absolute(0), public_comment_count=absolute(1)
+        )
+
+
+class CommentsDescriptor(ReverseGenericManyToOneDescriptor):
+    """`target.comments`, whose `add()` refuses comments of other targets: moving
+    one would leave its replies and its targets' counters behind."""
+
+    @cached_property
+    def related_manager_cls(self):
+        manager_cls = super().related_manager_cls
+
+        class CommentsManager(manager_cls):
+            def add(self, *objs, bulk=True):
+                key = (self.content_type.pk, str(self.pk_val))
+                if any(
+                    isinstance(obj, self.model) and obj._target_key != key
+                    for obj in objs
+                ):
+                    raise ValueError(
+                        "Comments stay on their target, create new ones with"
+                        " `target.comments.create()`"
+                    )
+                super().add(*objs, bulk=bulk)
+
+            add.alters_data = True
+
+        return CommentsManager
+
+
+class CommentsRelation(GenericRelation):
+    """`GenericRelation` to `Comment` over the column typed like the pk of the
+    model it is added to, see `object_pk_field()`."""
+
+    def contribute_to_class(self, cls, name, **kwargs):
+        if not cls._meta.abstract:
+            self.object_id_field_name = object_pk_field(cls)
+        super().contribute_to_class(cls, name, **kwargs)
+        setattr(cls, self.name, CommentsDescriptor(self.remote_field))
 
 
 class AbstractCommentable(models.Model):
-    comments = GenericRelation(Comment, related_query_name="%(app_label)s_%(class)ss")
+    comments = CommentsRelation(Comment, related_query_name="%(app_label)s_%(class)ss")
+
+    comment_lookup_field = "pk"
+    """Identifies a target in its `add_comment_url`, e.g. a unique `slug`."""
+
+    @classmethod
+    def closed_for_comments(cls) -> models.QuerySet:
+        """Targets whose threads `archive_comments --closed` archives whatever their
+        age, e.g. `cls.objects.filter(is_locked=True)`; none unless overridden."""
+        return cls._base_manager.none()
+
+    # maintained on every write through `Comment`, see `counters.update_counters()`
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    public_comment_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = CommentableQuerySet.as_manager()
 
     class Meta:
         abstract = True
 
+    @property
+    def add_comment_url(self) -> str:
+        """Where `{% list_comments %}` posts new comments to this target: the generic
+        `comments:add_comment` endpoint, see `comments.registry`."""
+        from .registry import registry
+
+        return registry.url_for(self)
+
     @classproperty
     def _comment_label(cls) -> str:
         return f"add_comment_{cls._meta.model_name}"
 
     @classmethod
     def set_add_comment_url(cls, idx) -> str:
-        """An `add_comment_url` needs to be initialized by all models inheriting from
-        `AbstractCommentable`. This function generates a named route. The route
-        originates from `set_add_comment_path`, which is added by the inheriting model
-        to its URL patterns.
-
-        Args:
-            idx ([type]): This can either be the inheriting model instance's `slug` or
-            `pk`, depending on the model's structure.
-
-        Returns:
-            str: a URL which will lead to to an `idx` instance. Calling this URL will
-            enable the commenting function under `allow_commenting_form_on_target_instance()`
-            to work.
-        """  # noqa: E501
+        """Deprecated: `add_comment_url` is served by the generic endpoint, see
+        `comments.registry`. The URL of a route added with the deprecated
+        `set_add_comment_path()`, for the target identified by `idx`, e.g. its `pk`
+        or `slug`."""
+        warnings.warn(
+            "set_add_comment_url() is deprecated, use add_comment_url",
+            DeprecationWarning,
+            stacklevel=2,
+        )
         return reverse(f"{cls._meta.app_label}:{cls._comment_label}", args=[idx])
 
     @classmethod
     def set_add_comment_path(
         cls, endpoint_token: str, func_comment: Callable
     ) -> URLPattern:
-        """The resulting path needs to be added to `urlpatterns`.
-
-        Args:
-            endpoint_token (str): e.g. <pk:int> or <title_slug:slug>, a converter URL parameter based on path converters
-            func_comment (Callable): function call results in a TemplateResponse
-
-        Returns:
-            URLPattern: Should be added to `urlpatterns` list of `app_name`, inheriting child of AbstractCommentable.
-        """  # noqa: E501
+        """Deprecated: comments are added through `comments:add_comment`, without
+        routes per model. A route to `func_comment`, at `endpoint_token`, e.g.
+        `<int:pk>` or `<slug:slug>`, for the model's own `urlpatterns`;
+        `func_comment` would call `allow_commenting_form_on_target_instance()`."""
+        warnings.warn(
+            "set_add_comment_path() is deprecated, use comments:add_comment",
+            DeprecationWarning,
+            stacklevel=2,
+        )
         return path(
             f"{cls._comment_label}/{endpoint_token}",
             func_comment,
@@ -104,29 +752,30 @@ class AbstractCommentable(models.Model):
         )
 
     @classmethod
+    @instrumented("add_comment")
+    @throttled
     def allow_commenting_form_on_target_instance(
         cls, request: HttpRequest, target_obj: ContentType
     ) -> Union[TemplateResponse, HttpResponseRedirect]:
-        """This cannot be determined without a declaration of the inheriting model. After the `target_obj` is determined, the signature will be complete for `func_comment` in `set_add_comment_path()`.
+        """The comment form for `target_obj`, then the comment posted, as
+        `comments:add_comment` serves them; for views of the inheriting model that
+        already hold the target, e.g. routes added with the deprecated
+        `set_add_comment_path()`. Anonymous users are redirected to log in."""
+        from .views import add_comment_to
 
-        Args:
-            request (HttpRequest): Can be either GET or POST methods.
-            target_obj (ContentType): The model instance being commented on.
+        ct = ContentType.objects.get_for_model(target_obj)
+        return add_comment_to(request, ct.id, target_obj.pk)
 
-        Returns:
-            Union[TemplateResponse, HttpResponseRedirect]: If the user is not logged in, redirect via `HttpResponseRedirect`. Otherwise enable get/post requests resulting in a `TemplateResponse`.
-        """  # noqa: E501
-        from .forms import CommentModelForm
-
-        if not request.user.is_authenticated:  # required to comment
-            return redirect("%s?next=%s" % (settings.LOGIN_URL, request.path))
-
-        form = CommentModelForm(request.POST or None)
-        if request.method == "POST" and form.is_valid():
-            comment = form.save(commit=False)
-            comment.author = request.user
-            comment.content_object = target_obj
-            comment.save()
-            context = {"inserted": comment, "form_url": request.path}
-            return TemplateResponse(request, "comments/inserter.html", context)
-        return TemplateResponse(request, "comments/form.html", {"form": form})
+    @classmethod
+    @instrumented("add_comment")
+    @throttled
+    async def aallow_commenting_form_on_target_instance(
+        cls, request: HttpRequest, target_obj: ContentType
+    ) -> Union[TemplateResponse, HttpResponseRedirect]:
+        """Async `allow_commenting_form_on_target_instance()`, for async views
+        under ASGI."""
+        from .async_views import aadd_comment_to
+
+        get_for_model = sync_to_async(ContentType.objects.get_for_model)
+        ct = await get_for_model(target_obj)
+        return await aadd_comment_to(request, ct.id, target_obj.pk)
@@ -0,0 +1,98 @@
+import base64
+import binascii
+import uuid
+from datetime import datetime
+from typing import List, Optional, Tuple
+from urllib.parse import urlencode
+
+from django.db.models import Q, QuerySet
+from django.urls import reverse
+
+from .conf import get_setting
+
+PAGE_ORDER = ("-modified", "-created", "-id")
+
+
+def encode_cursor(comment) -> str:
+    """The keyset of the last comment of a page, see `PAGE_ORDER`."""
+    raw = "|".join(
+        (comment.modified.isoformat(), comment.created.isoformat(), comment.id.hex)
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, datetime, uuid.UUID]:
+    """Raises `ValueError` if the `cursor` was not made by `encode_cursor()`."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        modified, created, idx = raw.split("|")
+        return (
+            datetime.fromisoformat(modified),
+            datetime.fromisoformat(created),
+            uuid.UUID(idx),
+        )
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def after_cursor(cursor: str) -> Q:
+    """Rows strictly after the keyset in `PAGE_ORDER`, i.e. the row-value
+    comparison `(modified, created, id) < (m, c, i)` spelled out for portability."""
+    modified, created, idx = decode_cursor(cursor)
+    return (
+        Q(modified__lt=modified)
+        | Q(modified=modified, created__lt=created)
+        | Q(modified=modified, created=created, id__lt=idx)
+    )
+
+
+def get_page(
+    queryset: QuerySet, cursor: Optional[str] = None, size: Optional[int] = None
+) -> Tuple[List, Optional[str]]:
+    """Keyset pagination: no `OFFSET`, so every page costs the same regardless of
+    how deep into the thread it is.
+
+    Args:
+        queryset (QuerySet): Comments, already filtered for visibility.
+        cursor (Optional[str], optional): From a previous page; None for the first.
+        size (Optional[int], optional): Defaults to `COMMENTS_PAGE_SIZE`.
+
+    Returns:
+        Tuple[List, Optional[str]]: The page of comments and the cursor of the next
+        page, if there is one.
+    """
+    size = size or get_setting("COMMENTS_PAGE_SIZE")
+    return split_page(list(_page_queryset(queryset, cursor, size)), size)
+
+
+async def aget_page(
+    queryset: QuerySet, cursor: Optional[str] = None, size: Optional[int] = None
+) -> Tuple[List, Optional[str]]:
+    """Async `get_page()`"""
+    size = size or get_setting("COMMENTS_PAGE_SIZE")
+    rows = [row async for row in _page_queryset(queryset, cursor, size)]
+    return split_page(rows, size)
+
+
+def _page_queryset(queryset: QuerySet, cursor: Optional[str], size: int) -> QuerySet:
+    """One row more than the page, to tell whether there is a next page."""
+    if cursor:
+        queryset = queryset.filter(after_cursor(cursor))
+    return queryset.order_by(*PAGE_ORDER)[: size + 1]
+
+
+def split_page(rows: List, size: int) -> Tuple[List, Optional[str]]:
+    """A page of `size` from rows already in `PAGE_ORDER`, one more than `size`
+    if there is a next page, e.g. as prefetched by `prefetch_visible_comments()`."""
+    if len(rows) > size:
+        return rows[:size], encode_cursor(rows[size - 1])
+    return rows, None
+
+
+def page_url(content_type_id: int, object_id, cursor: str) -> str:
+    """Where the "load more" sentinel of a thread page fetches the next page."""
+    url = reverse(
+        "comments:hx_list_comments",
+        kwargs={"content_type_id": content_type_id, "object_id": object_id},
+    )
+    return f"{url}?{urlencode({'cursor': cursor})}"
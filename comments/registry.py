@@ -0,0 +1,93 @@
+"""Every concrete `AbstractCommentable` model, found when the app is ready, so
+that one endpoint, `comments:add_comment`, adds comments to any of them by
+content type id and `comment_lookup_field` value, instead of a route per model."""
+from functools import lru_cache
+from typing import Dict, Optional, Tuple, Type
+from urllib.parse import quote
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db import models
+from django.urls import get_script_prefix, get_urlconf, reverse
+
+_CONTENT_TYPE_PLACEHOLDER = 2**31 - 1
+_LOOKUP_PLACEHOLDER = "-lookup-"
+
+
+@lru_cache(maxsize=None)
+def _add_url_parts(urlconf: str, script_prefix: str) -> Tuple[str, str, str]:
+    kwargs = {
+        "content_type_id": _CONTENT_TYPE_PLACEHOLDER,
+        "lookup": _LOOKUP_PLACEHOLDER,
+    }
+    url = reverse("comments:add_comment", kwargs=kwargs, urlconf=urlconf)
+    head, _, rest = url.partition(str(_CONTENT_TYPE_PLACEHOLDER))
+    middle, _, tail = rest.partition(_LOOKUP_PLACEHOLDER)
+    return head, middle, tail
+
+
+def add_comment_url(content_type_id: int, lookup) -> str:
+    """Same as reversing `comments:add_comment`, but resolved once per urlconf and
+    script prefix, like `comment_url()`."""
+    urlconf = get_urlconf() or settings.ROOT_URLCONF
+    head, middle, tail = _add_url_parts(urlconf, get_script_prefix())
+    return f"{head}{content_type_id}{middle}{quote(str(lookup), safe='')}{tail}"
+
+
+class CommentableRegistry:
+    def __init__(self):
+        self.lookups: Dict[Type[models.Model], str] = {}
+
+    def register(self, model: Type[models.Model]):
+        """Raises `ImproperlyConfigured` unless the `comment_lookup_field` of `model`
+        identifies one row, as `pk` does."""
+        lookup = model.comment_lookup_field
+        if lookup != "pk" and not model._meta.get_field(lookup).unique:
+            raise ImproperlyConfigured(
+                f"{model.__name__}.comment_lookup_field {lookup!r} is not unique"
+            )
+        self.lookups[model] = lookup
+
+    def discover(self):
+        from .models import AbstractCommentable
+
+        for model in apps.get_models():
+            if issubclass(model, AbstractCommentable):
+                self.register(model)
+
+    def resolve(self, content_type_id: int) -> Optional[Type[models.Model]]:
+        """The registered model of `content_type_id`, from the cache of content
+        types after the first lookup."""
+        try:
+            ct = ContentType.objects.get_for_id(content_type_id)
+        except ContentType.DoesNotExist:
+            return None
+        model = ct.model_class()
+        return model if model in self.lookups else None
+
+    def target_pk(self, model: Type[models.Model], lookup: str):
+        """The pk of the target, if it exists, without loading the rest of it."""
+        field = self.lookups[model]
+        return self._pks(model, field, lookup).first()
+
+    async def atarget_pk(self, model: Type[models.Model], lookup: str):
+        """Async `target_pk()`"""
+        field = self.lookups[model]
+        return await self._pks(model, field, lookup).afirst()
+
+    @staticmethod
+    def _pks(model: Type[models.Model], field: str, lookup: str):
+        try:
+            value = model._meta.pk.to_python(lookup) if field == "pk" else lookup
+        except ValidationError:  # e.g. a malformed integer or uuid
+            return model._base_manager.none().values_list("pk", flat=True)
+        return model._base_manager.filter(**{field: value}).values_list("pk", flat=True)
+
+    def url_for(self, target: models.Model) -> str:
+        ct = ContentType.objects.get_for_model(target)
+        return add_comment_url(ct.id, getattr(target, target.comment_lookup_field))
+
+
+registry = CommentableRegistry()
@@ -0,0 +1,40 @@
+"""Replies below a comment, as rendered by `comments/replies.html`: one query for
+`COMMENTS_REPLY_DEPTH` levels of the subtree, in thread order, so the template
+lays them out without recursive includes. Replies at the last level load their
+own the same way, on demand."""
+from typing import Iterable, List, Optional
+
+from .conf import get_setting
+from .models import SEGMENT, Comment
+
+
+def arrange(root: Comment, rows: Iterable[Comment], depth: int) -> List[Comment]:
+    """Drops replies below any the viewer cannot see, and marks each reply with
+    its `indent` below `root` and whether its own replies are `replies_loaded`."""
+    shown, arranged = {root.path}, []
+    for comment in rows:
+        if comment.path[:-SEGMENT] not in shown:
+            continue
+        shown.add(comment.path)
+        comment.indent = comment.depth - root.depth - 1
+        comment.replies_loaded = comment.depth < root.depth + depth
+        arranged.append(comment)
+    return arranged
+
+
+def _subtree(root: Comment, user, depth: int):
+    return Comment.objects.subtree(root, depth).visible_to(user).for_cards()
+
+
+def load_replies(root: Comment, user, depth: Optional[int] = None) -> List[Comment]:
+    depth = depth or get_setting("COMMENTS_REPLY_DEPTH")
+    return arrange(root, _subtree(root, user, depth), depth)
+
+
+async def aload_replies(
+    root: Comment, user, depth: Optional[int] = None
+) -> List[Comment]:
+    """Async `load_replies()`"""
+    depth = depth or get_setting("COMMENTS_REPLY_DEPTH")
+    rows = [comment async for comment in _subtree(root, user, depth)]
+    return arrange(root, rows, depth)
@@ -0,0 +1,88 @@
+"""Comment reads from a replica, writes to the primary, for projects that set
+`COMMENTS_REPLICA_DATABASE` to a `DATABASES` alias and list
+`"comments.routers.ReplicaRouter"` in `DATABASE_ROUTERS`.
+
+Replicas lag behind, so reads stay on the primary where they would otherwise
+miss a write just made: within transactions on the primary, for the rest of a
+request that writes, and, through `StickyPrimaryMiddleware`, for the next
+`COMMENTS_PRIMARY_STICKY_SECONDS` of the client that wrote. Other apps' models
+are left to the next router or the default database."""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpRequest, HttpResponse
+
+from .conf import get_setting
+from .throttle import WRITES
+
+APP_LABEL = "comments"
+STICKY_COOKIE = "comments_primary_until"
+
+_pinned: ContextVar[bool] = ContextVar("comments_pinned", default=False)
+
+
+@contextmanager
+def use_primary():
+    """Read comments from the primary within the block, e.g. in a script that
+    reads back what it wrote."""
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replica = get_setting("COMMENTS_REPLICA_DATABASE")
+        if not replica or model._meta.app_label != APP_LABEL:
+            return None
+        if _pinned.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return replica
+
+    def db_for_write(self, model, **hints):
+        if get_setting("COMMENTS_REPLICA_DATABASE") and (
+            model._meta.app_label == APP_LABEL
+        ):
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Replicas mirror the primary, so rows from either may be related."""
+        return True if get_setting("COMMENTS_REPLICA_DATABASE") else None
+
+
+def _sticky(request: HttpRequest) -> bool:
+    try:
+        return float(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class StickyPrimaryMiddleware:
+    """Pins comment reads to the primary for requests that write, and for the
+    client's requests within `COMMENTS_PRIMARY_STICKY_SECONDS` of a successful
+    write, remembered in a cookie, so that their own changes never seem to
+    vanish behind replica lag."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        writes = request.method in WRITES
+        token = _pinned.set(writes or _sticky(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _pinned.reset(token)
+        if writes and response.status_code < 400:
+            if get_setting("COMMENTS_REPLICA_DATABASE"):
+                window = get_setting("COMMENTS_PRIMARY_STICKY_SECONDS")
+                until = f"{time.time() + window:.3f}"
+                response.set_cookie(
+                    STICKY_COOKIE, until, max_age=window, httponly=True, samesite="Lax"
+                )
+        return response
@@ -0,0 +1,135 @@
+"""Full-text search over `Comment.content`, backed by the database's own index:
+
+- SQLite: a contentless FTS5 table, kept in sync by triggers on insert, update
+  of `content` and delete, whose rowids map to comment ids through a table of
+  their own, as the implicit rowids of the comment table are renumbered by
+  `VACUUM`;
+- Postgres: a GIN index on the `tsvector` of `content`, matched by
+  `SearchVector`, which Postgres maintains itself.
+
+Other backends fall back to `icontains`. The index is installed by migrations
+`0003_comment_search` and `0008_comment_search_keys`; a later migration that
+makes SQLite remake the comment table, dropping its triggers, should run
+`install_search()` again."""
+import re
+
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = "comments_comment_fts"
+FTS_KEYS = "comments_comment_fts_keys"
+TRIGGERS = ("insert", "delete", "update")
+GIN_INDEX = "comment_content_search_idx"
+SEARCH_CONFIG = "english"
+
+
+def _sqlite_statements(table: str):
+    fts, keys = FTS_TABLE, FTS_KEYS
+    add = (
+        f"INSERT INTO {fts}(rowid, content)"
+        f" SELECT rowid, new.content FROM {keys} WHERE id = new.id;"
+    )
+    remove = (
+        f"INSERT INTO {fts}({fts}, rowid, content)"
+        f" SELECT 'delete', rowid, old.content FROM {keys} WHERE id = old.id;"
+    )
+    return [
+        *_sqlite_drop_statements(),
+        f"CREATE VIRTUAL TABLE {fts} USING fts5(content, content='')",
+        f"CREATE TABLE {keys} (rowid INTEGER PRIMARY KEY, id char(32) NOT NULL UNIQUE)",
+        (
+            f"CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} BEGIN"
+            f" INSERT INTO {keys}(id) VALUES (new.id); {add} END"
+        ),
+        (
+            f"CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN"
+            f" {remove} DELETE FROM {keys} WHERE id = old.id; END"
+        ),
+        (
+            f"CREATE TRIGGER {fts}_update AFTER UPDATE OF content ON {table} BEGIN"
+            f" {remove} {add} END"
+        ),
+        f"INSERT INTO {keys}(id) SELECT id FROM {table}",
+        (
+            f"INSERT INTO {fts}(rowid, content) SELECT {keys}.rowid, {table}.content"
+            f" FROM {keys} INNER JOIN {table} ON {table}.id = {keys}.id"
+        ),
+    ]
+
+
+def _sqlite_drop_statements():
+    return [
+        *(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{name}" for name in TRIGGERS),
+        f"DROP TABLE IF EXISTS {FTS_TABLE}",
+        f"DROP TABLE IF EXISTS {FTS_KEYS}",
+    ]
+
+
+def _gin_index():
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    return GinIndex(SearchVector("content", config=SEARCH_CONFIG), name=GIN_INDEX)
+
+
+def install_search(apps, schema_editor):
+    """Idempotent: (re)creates the index and its triggers, then rebuilds it from the
+    comment table. For `migrations.RunPython`."""
+    Comment = apps.get_model("comments", "Comment")
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        for statement in _sqlite_statements(Comment._meta.db_table):
+            schema_editor.execute(statement)
+    elif vendor == "postgresql":
+        table = schema_editor.quote_name(Comment._meta.db_table)
+        schema_editor.execute(f"DROP INDEX IF EXISTS {GIN_INDEX}")
+        schema_editor.add_index(Comment, _gin_index())
+        schema_editor.execute(f"ANALYZE {table}")
+
+
+def uninstall_search(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        for statement in _sqlite_drop_statements():
+            schema_editor.execute(statement)
+    elif vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {GIN_INDEX}")
+
+
+def fts5_query(terms: str) -> str:
+    """Every word of `terms` as a quoted FTS5 string, i.e. all must match and
+    user input cannot form FTS5 syntax; the last word also matches as a prefix."""
+    words = re.findall(r"\w+", terms)
+    quoted = ['"%s"' % word for word in words]
+    if quoted:
+        quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def search(queryset: QuerySet, terms: str) -> QuerySet:
+    """Comments of `queryset` matching `terms`; none if `terms` has no words."""
+    if not re.search(r"\w", terms):
+        return queryset.none()
+    vendor = connections[queryset.db].vendor
+    if vendor == "sqlite":
+        matches = RawSQL(
+            (
+                f"SELECT {FTS_KEYS}.id FROM {FTS_TABLE} INNER JOIN {FTS_KEYS}"
+                f" ON {FTS_KEYS}.rowid = {FTS_TABLE}.rowid WHERE {FTS_TABLE} MATCH %s"
+            ),
+            (fts5_query(terms),),
+        )
+        return queryset.filter(pk__in=matches)
+    if vendor == "postgresql":
+        from django.contrib.postgres.search import SearchQuery, SearchVector
+
+        return queryset.alias(
+            search_vector=SearchVector("content", config=SEARCH_CONFIG)
+        ).filter(
+            search_vector=SearchQuery(
+                terms, config=SEARCH_CONFIG, search_type="websearch"
+            )
+        )
+    words = re.findall(r"\w+", terms)
+    return queryset.filter(Q(*(Q(content__icontains=word) for word in words)))
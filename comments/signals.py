@@ -0,0 +1,21 @@
+from django.dispatch import Signal
+
+comments_changed = Signal()
+"""Sent with `sender=Comment` from within the transaction that created, changed
+or removed comments, however they were written: a single `save()` / `delete()`
+or a queryset-wide operation.
+
+Keyword Args:
+    deltas (Dict[Tuple[int, str], Tuple[int, int]]): Keyed by the target's
+        `(content_type_id, object_id)`, the change in its `(total, public)` number
+        of comments. Every target written to is present, even if at `(0, 0)`.
+"""
+
+comment_metrics = Signal()
+"""Sent with `sender` as the name of the instrumented view or template tag once it
+is done, if `COMMENTS_INSTRUMENTATION` is on.
+
+Keyword Args:
+    metrics (comments.instrumentation.Metrics): What it cost.
+    request (Optional[HttpRequest]): The request it was part of, if known.
+"""
@@ -0,0 +1,106 @@
+"""A whole thread as a stream of rendered cards, for exports, crawlers and no-JS
+clients: rows are fetched `COMMENTS_STREAM_CHUNK_SIZE` at a time and each chunk
+is rendered and sent before the next is fetched, so memory is bounded by the
+chunk rather than by the length of the thread."""
+from typing import AsyncIterator, Iterable, Iterator, List, Optional
+
+from django.db.models import F, QuerySet, Window
+from django.db.models.functions import FirstValue, Substr
+from django.template.loader import get_template
+from django.urls import reverse
+
+from .cache import DETAIL
+from .conf import get_setting
+from .models import SEGMENT
+
+HEAD = '<div class="comments-thread">'
+TAIL = "</div>"
+
+
+def stream_url(content_type_id: int, object_id) -> str:
+    return reverse(
+        "comments:stream_comments",
+        kwargs={"content_type_id": content_type_id, "object_id": object_id},
+    )
+
+
+def _chunk_size(chunk_size: Optional[int]) -> int:
+    return chunk_size or get_setting("COMMENTS_STREAM_CHUNK_SIZE")
+
+
+def _render(comments: Iterable, user) -> str:
+    """Cards are rendered without the card cache: a stream reads every card of a
+    thread once, which would only evict the cards that are actually reused."""
+    template = get_template(DETAIL)
+    return "".join(
+        template.render({"comment": comment, "user": user}) for comment in comments
+    )
+
+
+def _thread_order(queryset: QuerySet) -> QuerySet:
+    """Top-level comments in `PAGE_ORDER`, each followed by its replies in path
+    order, i.e. every reply right after its parent. Threads are told apart by the
+    first segment of their paths and sorted by the first row of each, their
+    top-level comment."""
+    thread = Substr("path", 1, SEGMENT)
+    first = {"partition_by": [thread], "order_by": F("path").asc()}
+    return queryset.annotate(
+        thread=thread,
+        thread_modified=Window(FirstValue("modified"), **first),
+        thread_created=Window(FirstValue("created"), **first),
+    ).order_by("-thread_modified", "-thread_created", "-thread", "path")
+
+
+class _Pruner:
+    """Drops replies below any the viewer cannot see, as `arrange()` does,
+    remembering the paths shown of the current thread only."""
+
+    def __init__(self):
+        self.shown = set()
+
+    def __call__(self, comment) -> bool:
+        if not comment.depth:
+            self.shown = {comment.path}
+        elif comment.path[:-SEGMENT] in self.shown:
+            self.shown.add(comment.path)
+        else:
+            return False
+        return True
+
+
+def stream_thread(
+    queryset: QuerySet, user, chunk_size: Optional[int] = None
+) -> Iterator[str]:
+    """Rendered cards of `queryset` (already filtered for visibility) in thread
+    order, see `_thread_order()`, one string per chunk of rows, e.g. for a
+    `StreamingHttpResponse`."""
+    size, shown = _chunk_size(chunk_size), _Pruner()
+    yield HEAD
+    chunk: List = []
+    for comment in _thread_order(queryset).iterator(chunk_size=size):
+        if shown(comment):
+            chunk.append(comment)
+        if len(chunk) == size:
+            yield _render(chunk, user)
+            chunk = []
+    if chunk:
+        yield _render(chunk, user)
+    yield TAIL
+
+
+async def astream_thread(
+    queryset: QuerySet, user, chunk_size: Optional[int] = None
+) -> AsyncIterator[str]:
+    """Async `stream_thread()`, for a `StreamingHttpResponse` served under ASGI."""
+    size, shown = _chunk_size(chunk_size), _Pruner()
+    yield HEAD
+    chunk: List = []
+    async for comment in _thread_order(queryset).aiterator(chunk_size=size):
+        if shown(comment):
+            chunk.append(comment)
+        if len(chunk) == size:
+            yield _render(chunk, user)
+            chunk = []
+    if chunk:
+        yield _render(chunk, user)
+    yield TAIL
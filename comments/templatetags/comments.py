@@ -1,28 +1,73 @@
 from django import template
+from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ImproperlyConfigured
-from django.db.models import Q
+from django.utils.safestring import mark_safe
+
+from ..archive import archived_thread
+from ..cache import cached_thread, render_detail
+from ..conf import get_setting
+from ..forms import CommentModelForm
+from ..instrumentation import instrument, rendering
+from ..models import PREFETCHED
+from ..pagination import get_page, page_url, split_page
 
 register = template.Library()
 
+LIST = "comments/list.html"
+
 
-@register.inclusion_tag("comments/list.html", takes_context=True)
+@register.simple_tag(takes_context=True)
 def list_comments(context, sentinel_target_obj, head_label="Add a Comment"):
+    """Renders `comments/list.html`. Anonymous viewers all get the same public-only
+    thread, so theirs is cached per thread generation, see `cached_thread()`."""
     if not hasattr(sentinel_target_obj, "comments"):
         raise ImproperlyConfigured
 
     if not hasattr(sentinel_target_obj, "add_comment_url"):
         raise ImproperlyConfigured
 
-    criteria = {"is_public": True}
-    if context["user"].is_authenticated:
-        criteria |= {"author": context["user"]}
-    or_condition = Q()
-    for k, v in criteria.items():
-        or_condition.add(Q(**{k: v}), Q.OR)
-
-    return {
-        "head_label": head_label,
-        "user": context["user"],
-        "comments": sentinel_target_obj.comments.filter(or_condition),
-        "form_url": sentinel_target_obj.add_comment_url,
-    }
+    user = context["user"]
+    ct = ContentType.objects.get_for_model(sentinel_target_obj)
+
+    def render() -> str:
+        prefetched = getattr(sentinel_target_obj, PREFETCHED, None)
+        if prefetched is not None:
+            size = get_setting("COMMENTS_PAGE_SIZE")
+            comments, cursor = split_page(prefetched, size)
+        else:
+            comments, cursor = get_page(
+                sentinel_target_obj.comments.visible_to(user).top_level().for_cards()
+            )
+        new_context = context.new(
+            {
+                "head_label": head_label,
+                "user": user,
+                "comments": comments,
+                "next_url": cursor and page_url(ct.id, sentinel_target_obj.pk, cursor),
+                "form_url": sentinel_target_obj.add_comment_url,
+                "new_form": user.is_authenticated and CommentModelForm(),
+            }
+        )
+        if (csrf_token := context.get("csrf_token")) is not None:
+            new_context["csrf_token"] = csrf_token
+        with rendering():
+            return context.template.engine.get_template(LIST).render(new_context)
+
+    with instrument("list_comments", context.get("request")):
+        if user.is_authenticated:
+            return mark_safe(render())
+        return mark_safe(cached_thread(ct.id, sentinel_target_obj.pk, render))
+
+
+@register.simple_tag
+def list_archived_comments(sentinel_target_obj):
+    """The archived comments of the target, read-only, rendered once and cached
+    until more of its thread is archived, see `comments.archive`."""
+    ct = ContentType.objects.get_for_model(sentinel_target_obj)
+    return mark_safe(archived_thread(ct.id, sentinel_target_obj.pk))
+
+
+@register.simple_tag(takes_context=True)
+def comment_detail(context, comment):
+    """`comments/detail.html` for `comment`, served from the card cache if possible."""
+    return render_detail(comment, context)
@@ -0,0 +1,151 @@
+"""Token-bucket limits on comment writes, per user and per IP, configured by
+`COMMENTS_RATE_LIMITS`, e.g. `{"user": "30/m", "ip": "60/m"}`. A bucket holds
+as many tokens as the rate allows per period and refills continuously; each
+write takes one, and a write finding its buckets empty gets a 429 before the
+view does any ORM work.
+
+Buckets live in the Django cache (`CacheBuckets`, shared by processes using the
+same cache, approximate under concurrent writes to one bucket) or in the process
+(`LocalBuckets`, e.g. for tests), see `COMMENTS_RATE_LIMIT_BUCKETS`."""
+import asyncio
+import math
+import threading
+import time
+from collections import Counter
+from functools import lru_cache, wraps
+from typing import Callable, Dict, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import SESSION_KEY
+from django.http import HttpRequest, HttpResponse
+from django.utils.module_loading import import_string
+
+from .cache import get_cache
+from .conf import get_setting
+
+PERIODS = {"s": 1, "m": 60, "h": 60 * 60, "d": 60 * 60 * 24}
+WRITES = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+throttle_counts: Counter = Counter()
+"""Per-process `accepted` / `throttled` writes."""
+
+Bucket = Tuple[float, float]  # tokens left, when last refilled
+
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """`"30/m"` as `(30, 60)`: tokens per period of seconds."""
+    count, _, period = rate.partition("/")
+    return int(count), PERIODS[period[:1]]
+
+
+def refill(bucket: Optional[Bucket], rate: str, at: float) -> Tuple[bool, Bucket]:
+    """Whether a token could be taken from `bucket`, and the bucket after."""
+    capacity, period = parse_rate(rate)
+    tokens, last = bucket or (capacity, at)
+    tokens = min(capacity, tokens + (at - last) * capacity / period)
+    if tokens < 1:
+        return False, (tokens, at)
+    return True, (tokens - 1, at)
+
+
+def retry_after(rate: str) -> int:
+    capacity, period = parse_rate(rate)
+    return math.ceil(period / capacity)
+
+
+class CacheBuckets:
+    def take(self, key: str, rate: str) -> bool:
+        cache = get_cache()
+        taken, bucket = refill(cache.get(key), rate, time.time())
+        cache.set(key, bucket, parse_rate(rate)[1])
+        return taken
+
+
+class LocalBuckets:
+    def __init__(self):
+        self.buckets: Dict[str, Bucket] = {}
+        self.lock = threading.Lock()
+
+    def take(self, key: str, rate: str) -> bool:
+        with self.lock:
+            taken, self.buckets[key] = refill(
+                self.buckets.get(key), rate, time.monotonic()
+            )
+        return taken
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+@lru_cache(maxsize=None)
+def _buckets(path: str):
+    return import_string(path)()
+
+
+def get_buckets():
+    return _buckets(get_setting("COMMENTS_RATE_LIMIT_BUCKETS"))
+
+
+def _keys(request: HttpRequest) -> List[Tuple[str, str]]:
+    """Bucket key and rate of each configured limit that applies to `request`. The
+    user is read off the session rather than loaded: free with cached or signed
+    cookie sessions, one query of the session row with database sessions."""
+    limits, keys = get_setting("COMMENTS_RATE_LIMITS"), []
+    if (rate := limits.get("ip")) and (ip := request.META.get("REMOTE_ADDR")):
+        keys.append((f"comments:throttle:ip:{ip}", rate))
+    if (rate := limits.get("user")) and hasattr(request, "session"):
+        if user_id := request.session.get(SESSION_KEY):
+            keys.append((f"comments:throttle:user:{user_id}", rate))
+    return keys
+
+
+def check(request: HttpRequest) -> Optional[HttpResponse]:
+    """None if `request` may proceed, else the 429 response to send instead. Reads
+    and other requests without a configured limit always proceed."""
+    if request.method not in WRITES:
+        return None
+    keys = _keys(request)
+    if not keys:
+        return None
+    buckets = get_buckets()
+    for key, rate in keys:
+        if not buckets.take(key, rate):
+            throttle_counts["throttled"] += 1
+            headers = {"Retry-After": str(retry_after(rate))}
+            return HttpResponse("Too many comments", status=429, headers=headers)
+    throttle_counts["accepted"] += 1
+    return None
+
+
+def throttle_stats() -> Dict[str, float]:
+    accepted, throttled = throttle_counts["accepted"], throttle_counts["throttled"]
+    total = accepted + throttled
+    return {
+        "accepted": accepted,
+        "throttled": throttled,
+        "ratio": throttled / total if total else 0.0,
+    }
+
+
+def throttled(view: Callable):
+    """Rate limit a sync or async view, or any callable taking the request among
+    its arguments, e.g. `allow_commenting_form_on_target_instance()`."""
+
+    def request_of(args) -> HttpRequest:
+        return next(a for a in args if isinstance(a, HttpRequest))
+
+    if asyncio.iscoroutinefunction(view):
+
+        @wraps(view)
+        async def async_wrapper(*args, **kwargs):
+            refused = await sync_to_async(check)(request_of(args))
+            return refused or await view(*args, **kwargs)
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        return check(request_of(args)) or view(*args, **kwargs)
+
+    return wrapper
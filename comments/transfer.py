@@ -0,0 +1,171 @@
+"""Comments in and out as JSON Lines, one comment per line, for migrations from
+and to other systems. Both directions stream: `dump()` reads rows through a
+server-side cursor, `load()` reads lines a batch at a time, so memory is bounded
+by the batch rather than by the number of comments.
+
+A line holds the fields of a comment, with its target's content type as
+`"app_label.model"` and its author and parent by pk. `load()` accepts lines
+without `id`, `path`, `depth`, `modified` or `parent`, e.g. from a legacy
+system; parents must come before their replies, as they do in `dump()`."""
+import json
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import now
+
+from .counters import update_reply_counts
+from .models import Comment, path_segment
+from .search import install_search, uninstall_search
+from .signals import comments_changed
+
+FIELDS = (
+    "id",
+    "content_type_id",
+    "object_id",
+    "author_id",
+    "content",
+    "is_public",
+    "created",
+    "modified",
+    "parent_id",
+    "path",
+    "depth",
+    "deleted_at",
+)
+KEYS = {"content_type_id": "content_type", "author_id": "author", "parent_id": "parent"}
+
+
+class Encoder(DjangoJSONEncoder):
+    """Datetimes to the microsecond, which `DjangoJSONEncoder` rounds to the
+    millisecond."""
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def dump(queryset: QuerySet, chunk_size: int = 2000) -> Iterator[str]:
+    """A JSON line per comment of `queryset`, parents before replies."""
+    rows = queryset.order_by("path").values_list(*FIELDS)
+    for row in rows.iterator(chunk_size=chunk_size):
+        record = {KEYS.get(name, name): value for name, value in zip(FIELDS, row)}
+        content_type = ContentType.objects.get_for_id(record["content_type"])
+        record["content_type"] = ".".join(content_type.natural_key())
+        yield json.dumps(record, cls=Encoder) + "\n"
+
+
+def _datetime(value):
+    return parse_datetime(value) if isinstance(value, str) else value
+
+
+def _comment(record: Dict) -> Comment:
+    """Content types resolve through the cache of `ContentType.objects`."""
+    content_type = ContentType.objects.get_by_natural_key(
+        *record["content_type"].split(".")
+    )
+    created = _datetime(record.get("created")) or now()
+    return Comment(
+        id=record.get("id") or uuid.uuid4(),
+        content_type=content_type,
+        object_id=str(record["object_id"]),
+        author_id=record["author"],
+        content=record["content"],
+        is_public=record.get("is_public", False),
+        created=created,
+        modified=_datetime(record.get("modified")) or created,
+        parent_id=record.get("parent"),
+        # replies without a path are placed by `_place_replies()`
+        path=record.get("path")
+        or ("" if record.get("parent") else path_segment(created)),
+        depth=record.get("depth", 0),
+        deleted_at=_datetime(record.get("deleted_at")),
+    )
+
+
+def _place_replies(comments: List[Comment]):
+    """Replies without a path go under their parent, from this batch or already
+    stored, like `Comment._place_reply()`."""
+    orphans = [c for c in comments if c.parent_id and not c.path]
+    if not orphans:
+        return
+    parents = {c.id: c for c in comments}
+    stored = {c.parent_id for c in orphans} - set(parents)
+    parents.update(Comment.all_objects.in_bulk(stored))
+    for comment in orphans:
+        comment.path = path_segment(comment.created)
+        comment.parent = parents[comment.parent_id]
+        comment._place_reply()
+
+
+def _insert_raw(comments: List[Comment]):
+    """`bulk_create()` would stamp `created` and `modified` like any insert;
+    imports keep their own, inserted as they are, as fixtures are loaded."""
+    fields = Comment._meta.concrete_fields
+    for comment in comments:
+        comment._sync_object_pk()
+    size = connection.ops.bulk_batch_size(fields, comments)
+    for start in range(0, len(comments), size):
+        Comment.all_objects._insert(
+            comments[start : start + size], fields=fields, raw=True
+        )
+
+
+def _insert(comments: List[Comment]):
+    """One transaction per batch, keeping counters and reply counts consistent as
+    `create_for_objects()` does."""
+    live = [c for c in comments if c.deleted_at is None]
+    total = Counter(c._target_key for c in live)
+    public = Counter(c._target_key for c in live if c.is_public)
+    replies = Counter(c.parent_id for c in live if c.parent_id)
+    with transaction.atomic():
+        _insert_raw(comments)
+        update_reply_counts(Comment, replies)
+        comments_changed.send(
+            sender=Comment, deltas={k: (n, public[k]) for k, n in total.items()}
+        )
+
+
+def load(lines: Iterable[str], batch_size: int = 1000) -> Iterator[int]:
+    """Insert the comments of `lines`, yielding the size of each batch inserted."""
+    lines = iter(lines)
+    while batch := list(islice(lines, batch_size)):
+        comments = [_comment(json.loads(line)) for line in batch if line.strip()]
+        _place_replies(comments)
+        _insert(comments)
+        yield len(comments)
+
+
+@contextmanager
+def deferred_indexes():
+    """Drop the secondary indexes of the comment table, and the full-text index
+    with its triggers, then rebuild them all once the block is done: cheaper than
+    maintaining them row by row over a large import."""
+    indexes = Comment._meta.indexes
+    with connection.schema_editor() as editor:
+        for index in indexes:
+            editor.remove_index(Comment, index)
+        uninstall_search(apps, editor)
+    try:
+        yield
+    finally:
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                editor.add_index(Comment, index)
+            install_search(apps, editor)
+
+
+def throughput(count: int, started: float) -> str:
+    elapsed = time.monotonic() - started
+    return f"{count} comments in {elapsed:.1f}s ({count / (elapsed or 1e-9):.0f}/s)"
@@ -1,17 +1,45 @@
 from django.urls import path
 
 from .apps import CommentsConfig
-from .views import (
-    hx_del_comment,
-    hx_edit_comment,
-    hx_toggle_comment,
-    hx_view_comment,
-)
+from .conf import get_setting
+
+if get_setting("COMMENTS_ASYNC_VIEWS"):
+    from . import async_views as views
+else:
+    from . import views
 
 app_name = CommentsConfig.name
 urlpatterns = [
-    path("toggle/<uuid:id>", hx_toggle_comment, name="hx_toggle_comment"),
-    path("edit/<uuid:id>", hx_edit_comment, name="hx_edit_comment"),
-    path("delete/<uuid:id>", hx_del_comment, name="hx_del_comment"),
-    path("view/<uuid:id>", hx_view_comment, name="hx_view_comment"),
+    path(
+        "add/<int:content_type_id>/<str:lookup>",
+        views.add_comment,
+        name="add_comment",
+    ),
+    path("toggle/<uuid:id>", views.hx_toggle_comment, name="hx_toggle_comment"),
+    path("edit/<uuid:id>", views.hx_edit_comment, name="hx_edit_comment"),
+    path("delete/<uuid:id>", views.hx_del_comment, name="hx_del_comment"),
+    path("view/<uuid:id>", views.hx_view_comment, name="hx_view_comment"),
+    path("reply/<uuid:id>", views.hx_reply_comment, name="hx_reply_comment"),
+    path("replies/<uuid:id>", views.hx_list_replies, name="hx_list_replies"),
+    path(
+        "list/<int:content_type_id>/<str:object_id>",
+        views.hx_list_comments,
+        name="hx_list_comments",
+    ),
+    path("search", views.search_comments, name="search_comments"),
+    path(
+        "search/<int:content_type_id>/<str:object_id>",
+        views.search_comments,
+        name="search_thread_comments",
+    ),
+    path(
+        "stream/<int:content_type_id>/<str:object_id>",
+        views.stream_comments,
+        name="stream_comments",
+    ),
+    path(
+        "archive/<int:content_type_id>/<str:object_id>",
+        views.archived_comments,
+        name="archived_comments",
+    ),
 ]
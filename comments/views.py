@@ -1,38 +1,282 @@
 import uuid
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple, Union
+from urllib.parse import urlencode
 
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.http import HttpRequest, HttpResponse
-from django.shortcuts import get_object_or_404
+from django.db.models import Count, Max, QuerySet
+from django.http import (
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseRedirect,
+    StreamingHttpResponse,
+)
+from django.shortcuts import get_object_or_404, redirect
 from django.template.response import TemplateResponse
-from django.views.decorators.http import require_http_methods
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import (
+    condition,
+    require_GET,
+    require_http_methods,
+)
 
+from .archive import archived_thread
+from .cache import forget_card
+from .conf import get_setting
 from .forms import CommentModelForm
+from .instrumentation import instrumented
 from .models import Comment
+from .pagination import get_page, page_url
+from .registry import registry
+from .replies import load_replies
+from .streaming import stream_thread
+from .throttle import throttled
 
 CARD = "comments/card.html"
+PAGE = "comments/page.html"
+EDITOR = "comments/editor.html"
+REPLY = "comments/reply.html"
+REPLIES = "comments/replies.html"
 
 
+Validators = Tuple[Optional[str], Optional[datetime]]
+INSERTER = "comments/inserter.html"
+FORM = "comments/form.html"
+
+CARD_VERSION = ("modified", "author_id", "reply_count")
+PAGE_AGGREGATES = {"latest": Max("modified"), "total": Count("pk")}
+
+
+def conditional(validators: Callable[..., Validators]):
+    """`condition()` from a single function returning both the ETag and the
+    Last-Modified of a view, computed once per request."""
+
+    def memoized(request: HttpRequest, *args, **kwargs) -> Validators:
+        if not hasattr(request, "_comment_validators"):
+            request._comment_validators = validators(request, *args, **kwargs)
+        return request._comment_validators
+
+    return condition(
+        etag_func=lambda *args, **kwargs: memoized(*args, **kwargs)[0],
+        last_modified_func=lambda *args, **kwargs: memoized(*args, **kwargs)[1],
+    )
+
+
+def card_validators(request: HttpRequest, id: uuid.UUID) -> Validators:
+    row = Comment.objects.filter(id=id).values_list(*CARD_VERSION).first()
+    return card_validators_of(id, row, request.user)
+
+
+def card_validators_of(id: uuid.UUID, row, user) -> Validators:
+    """A card changes with its version and with whether the viewer owns it, i.e.
+    whether the edit / delete footer is rendered."""
+    if row is None:
+        return None, None
+    modified, author_id, reply_count = row
+    is_owner = author_id == user.pk
+    version = f"{modified.timestamp()}-{reply_count}"
+    return f"{id.hex}-{version}-{int(is_owner)}", modified
+
+
+def page_validators(
+    request: HttpRequest, content_type_id: int, object_id: str
+) -> Validators:
+    visible = Comment.objects.for_target(content_type_id, object_id)
+    found = visible.visible_to(request.user).aggregate(**PAGE_AGGREGATES)
+    return page_validators_of(request, request.user, found)
+
+
+def page_validators_of(request: HttpRequest, user, found: dict) -> Validators:
+    """A thread page changes with the latest `modified` or the count of the
+    comments visible to the viewer: any create, edit, toggle or delete moves one
+    of the two, and both come from a single aggregate query."""
+    latest = found["latest"]
+    parts = (
+        latest and latest.timestamp(),
+        found["total"],
+        user.pk,
+        get_setting("COMMENTS_PAGE_SIZE"),
+        request.GET.get("cursor", ""),
+    )
+    return "-".join(str(part) for part in parts), latest
+
+
+def add_comment_to(
+    request: HttpRequest, content_type_id: int, object_id
+) -> Union[TemplateResponse, HttpResponseRedirect]:
+    """The form to comment on a target, and once posted, the comment followed by a
+    blank form; the target is set by content type and id, not loaded."""
+    if not request.user.is_authenticated:  # required to comment
+        return redirect("%s?next=%s" % (settings.LOGIN_URL, request.path))
+
+    form = CommentModelForm(request.POST or None)
+    if request.method == "POST" and form.is_valid():
+        comment = form.save(commit=False)
+        comment.author = request.user
+        comment.content_type_id, comment.object_id = content_type_id, str(object_id)
+        comment.save()
+        return TemplateResponse(request, INSERTER, inserted_context(request, comment))
+    return TemplateResponse(request, FORM, {"form": form})
+
+
+def inserted_context(request: HttpRequest, comment: Comment) -> dict:
+    return {
+        "inserted": comment,
+        "new_form": CommentModelForm(),  # inline, saves a request for it
+        "form_url": request.path,
+    }
+
+
+@instrumented("add_comment")
+@throttled
+def add_comment(
+    request: HttpRequest, content_type_id: int, lookup: str
+) -> Union[TemplateResponse, HttpResponseRedirect]:
+    """`add_comment_to()` any registered `AbstractCommentable`, found by content type
+    id and `comment_lookup_field` with a query of its pk only."""
+    model = registry.resolve(content_type_id)
+    object_id = model and registry.target_pk(model, lookup)
+    if object_id is None:
+        raise Http404(f"No commentable {content_type_id}/{lookup}")
+    return add_comment_to(request, content_type_id, object_id)
+
+
+@instrumented("hx_list_comments")
+@require_GET
+@conditional(page_validators)
+def hx_list_comments(
+    request: HttpRequest, content_type_id: int, object_id: str
+) -> HttpResponse:
+    """The next page of cards of a thread, swapped in place of the `revealed`
+    sentinel that requested it."""
+    comments = Comment.objects.for_target(content_type_id, object_id)
+    try:
+        page, cursor = get_page(
+            comments.visible_to(request.user).top_level().for_cards(),
+            request.GET.get("cursor"),
+        )
+    except ValueError:
+        return HttpResponseBadRequest()
+    next_url = cursor and page_url(content_type_id, object_id, cursor)
+    return TemplateResponse(request, PAGE, {"comments": page, "next_url": next_url})
+
+
+@require_GET
+def stream_comments(
+    request: HttpRequest, content_type_id: int, object_id: str
+) -> StreamingHttpResponse:
+    """The whole thread in one response, rendered chunk by chunk as it is sent,
+    e.g. for exports, crawlers or clients without htmx."""
+    comments = Comment.objects.for_target(content_type_id, object_id)
+    cards = stream_thread(comments.visible_to(request.user).for_cards(), request.user)
+    return StreamingHttpResponse(cards, content_type="text/html; charset=utf-8")
+
+
+def archived_response(html: str) -> HttpResponse:
+    """Archived threads look the same to every viewer and only change when more of
+    them is archived, so browsers and shared caches may keep them too."""
+    response = HttpResponse(html)
+    max_age = get_setting("COMMENTS_ARCHIVE_CACHE_TIMEOUT") or 60 * 60 * 24
+    patch_cache_control(response, public=True, max_age=max_age)
+    return response
+
+
+@instrumented("archived_comments")
+@require_GET
+def archived_comments(
+    request: HttpRequest, content_type_id: int, object_id: str
+) -> HttpResponse:
+    """The archived part of a thread, read-only, see `comments.archive`."""
+    return archived_response(archived_thread(content_type_id, object_id))
+
+
+def search_page(
+    request: HttpRequest, comments: QuerySet, terms: str
+) -> Tuple[List, Optional[str]]:
+    """A page of the search results, and the URL of the next one. Raises
+    `ValueError` on a bad cursor, see `get_page()`."""
+    page, cursor = get_page(comments.search(terms), request.GET.get("cursor"))
+    next_url = cursor and f"{request.path}?{urlencode({'q': terms, 'cursor': cursor})}"
+    return page, next_url
+
+
+@instrumented("search_comments")
+@require_GET
+def search_comments(
+    request: HttpRequest,
+    content_type_id: Optional[int] = None,
+    object_id: Optional[str] = None,
+) -> HttpResponse:
+    """Cards matching the `q` parameter among those visible to the viewer, on one
+    target if given, else on all; paged like `hx_list_comments()`."""
+    comments = Comment.objects.visible_to(request.user).for_cards()
+    if content_type_id is not None:
+        comments = comments.for_target(content_type_id, object_id)
+    try:
+        page, next_url = search_page(request, comments, request.GET.get("q", ""))
+    except ValueError:
+        return HttpResponseBadRequest()
+    return TemplateResponse(request, PAGE, {"comments": page, "next_url": next_url})
+
+
+@instrumented("hx_list_replies")
+@require_GET
+def hx_list_replies(request: HttpRequest, id: uuid.UUID) -> TemplateResponse:
+    """Replies below a card, `COMMENTS_REPLY_DEPTH` levels in one query; those at
+    the last level offer to load their own in turn."""
+    visible = Comment.objects.visible_to(request.user).only("id", "path", "depth")
+    root = get_object_or_404(visible, id=id)
+    replies = load_replies(root, request.user)
+    return TemplateResponse(request, REPLIES, {"comments": replies})
+
+
+@instrumented("hx_reply_comment")
+@throttled
+@login_required
+def hx_reply_comment(request: HttpRequest, id: uuid.UUID) -> TemplateResponse:
+    """The reply form in place of the card's "Reply" button, then the reply in
+    place of the form."""
+    parent = get_object_or_404(Comment.objects.visible_to(request.user), id=id)
+    form = CommentModelForm(request.POST or None)
+    if request.method == "POST" and form.is_valid():
+        reply = form.save(commit=False)
+        reply.author, reply.parent = request.user, parent
+        reply.save()
+        return TemplateResponse(request, REPLY, {"comment": reply})
+    return TemplateResponse(request, EDITOR, {"form": form})
+
+
+@instrumented("hx_view_comment")
+@conditional(card_validators)
 def hx_view_comment(request: HttpRequest, id: uuid.UUID) -> TemplateResponse:
     comment = get_object_or_404(Comment, id=id)
     return TemplateResponse(request, CARD, {"comment": comment})
 
 
+@instrumented("hx_toggle_comment")
+@throttled
 @login_required
 def hx_toggle_comment(request: HttpRequest, id: uuid.UUID) -> TemplateResponse:
-    comment = Comment.get_for_user(id, request.user)
-    comment.is_public = False if comment.is_public else True
-    comment.save(update_fields=["is_public"])
+    comment = Comment.objects.toggle_for_user(id, request.user)
+    forget_card(id)
     return TemplateResponse(request, CARD, {"comment": comment})
 
 
+@instrumented("hx_del_comment")
+@throttled
 @login_required
 @require_http_methods(["DELETE"])
 def hx_del_comment(request: HttpRequest, id: uuid.UUID) -> HttpResponse:
-    comment = Comment.get_for_user(id, request.user)
-    comment.delete()
+    Comment.objects.delete_for_user(id, request.user)
+    forget_card(id)
     return HttpResponse(status=200, headers={"HX-Trigger": "commentDeleted"})
 
 
+@instrumented("hx_edit_comment")
+@throttled
 @login_required
 def hx_edit_comment(request: HttpRequest, id: uuid.UUID) -> TemplateResponse:
     """If a `form` is passed to the card, the update view is called; otherwse
@@ -40,6 +284,7 @@ def hx_edit_comment(request: HttpRequest, id: uuid.UUID) -> TemplateResponse:
     comment = Comment.get_for_user(id, request.user)
     form = CommentModelForm(request.POST or None, instance=comment)
     if request.method == "POST" and form.is_valid():
-        comment.save(update_fields=["content", "is_public"])
+        forget_card(comment.id)
+        comment.save(update_fields=["content", "is_public", "modified"])
         return TemplateResponse(request, CARD, {"comment": comment})
     return TemplateResponse(request, CARD, {"form": form, "comment": comment})
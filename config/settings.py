@@ -49,6 +49,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "comments.instrumentation.ServerTimingMiddleware",
+    "comments.routers.StickyPrimaryMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -79,9 +81,17 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
-    }
+    },
+    # read by comments only once `COMMENTS_REPLICA_DATABASE = "replica"`; stands
+    # in for a replica of `default`, e.g. in tests of `comments.routers`
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "db.replica.sqlite3",
+    },
 }
 
+DATABASE_ROUTERS = ["comments.routers.ReplicaRouter"]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:32
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_comment_counters(apps, schema_editor):
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    Comment = apps.get_model("comments", "Comment")
+    for model_name in ("sentinel", "sentinelslugged"):
+        model = apps.get_model("sentinels", model_name)
+        ct = ContentType.objects.filter(app_label="sentinels", model=model_name)
+        counts = (
+            Comment.objects.filter(content_type__in=ct)
+            .values("object_id")
+            .annotate(total=Count("pk"), public=Count("pk", filter=Q(is_public=True)))
+        )
+        for row in counts:
+            model.objects.filter(pk=row["object_id"]).update(
+                comment_count=row["total"], public_comment_count=row["public"]
+            )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("sentinels", "0001_initial"),
+        ("comments", "0002_comment_target_indexes"),
+        ("contenttypes", "0002_remove_content_type_name"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sentinel",
+            name="comment_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="sentinel",
+            name="public_comment_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="sentinelslugged",
+            name="comment_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="sentinelslugged",
+            name="public_comment_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_comment_counters, migrations.RunPython.noop),
+    ]
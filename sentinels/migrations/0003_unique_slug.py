@@ -0,0 +1,20 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:56
+
+import django_extensions.db.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("sentinels", "0002_comment_counters"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="sentinelslugged",
+            name="slug",
+            field=django_extensions.db.fields.AutoSlugField(
+                blank=True, editable=False, populate_from=["title"], unique=True
+            ),
+        ),
+    ]
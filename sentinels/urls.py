@@ -5,7 +5,6 @@ from .apps import SentinelsConfig
 from .models import Sentinel, SentinelSlugged
 
 sentinel_patterns = [
-    Sentinel.add_comment_path,
     path(
         "detail/sentinel/<int:pk>",
         DetailView.as_view(model=Sentinel, template_name="sentinel_detail.html"),
@@ -14,7 +13,6 @@ sentinel_patterns = [
 ]
 
 sentinel_slugged_patterns = [
-    SentinelSlugged.add_comment_path,
     path(
         "detail/sentinel_slugged/<slug:slug>",
         DetailView.as_view(model=SentinelSlugged, template_name="sentinel_detail.html"),
@@ -29,7 +27,10 @@ urlpatterns = (
     + [
         path(
             "",
-            ListView.as_view(model=Sentinel, template_name="sentinel_list.html"),
+            ListView.as_view(
+                queryset=Sentinel.objects.with_comment_counts(),
+                template_name="sentinel_list.html",
+            ),
             name="sentinel_list",
         ),
     ]
@@ -1,9 +1,17 @@
 import pytest
+from django.core.cache import cache
 
 from comments.models import Comment
 from sentinels.models import Sentinel
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Rendered comments are cached by target id, which are reused across tests."""
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def a_commenter(django_user_model):
     return django_user_model.objects.create(
@@ -0,0 +1,145 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.template import Context, Template
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
+
+from comments.archive import (
+    archive_threads,
+    archive_url,
+    archived_thread,
+    stale_threads,
+)
+from comments.models import ArchivedComment, Comment
+from sentinels.models import Sentinel, SentinelSlugged
+
+
+@pytest.fixture
+def an_old_thread(a_comment, another_commenter):
+    """a_comment > reply (public) > deeper; a_comment > private > hidden"""
+    reply = Comment.objects.create(
+        content="Old reply", author=another_commenter, parent=a_comment, is_public=True
+    )
+    deeper = Comment.objects.create(
+        content="Deeper", author=another_commenter, parent=reply, is_public=True
+    )
+    private = Comment.objects.create(
+        content="Private", author=another_commenter, parent=a_comment
+    )
+    hidden = Comment.objects.create(
+        content="Below private",
+        author=another_commenter,
+        parent=private,
+        is_public=True,
+    )
+    Comment.objects.update(modified=now() - timedelta(days=400))
+    return a_comment, reply, deeper, private, hidden
+
+
+@pytest.fixture
+def a_live_thread(a_commenter):
+    target = Sentinel.objects.create(title="Still discussed")
+    Comment.objects.create(
+        content="Fresh", author=a_commenter, content_object=target, is_public=True
+    )
+    return target
+
+
+def archive(*args):
+    call_command("archive_comments", *args, "--pause", "0")
+
+
+@pytest.mark.django_db
+def test_archive_moves_old_threads_whole(a_sentinel, an_old_thread, a_live_thread):
+    archive("--older-than", "365", "--batch-size", "2")
+
+    assert list(Comment.all_objects.values_list("content", flat=True)) == ["Fresh"]
+    archived = ArchivedComment.objects.order_by("path")
+    assert [c.id for c in archived] == [
+        c.id for c in sorted(an_old_thread, key=lambda c: c.path)
+    ]
+    assert archived[0].reply_count == 2
+    a_sentinel.refresh_from_db()
+    assert (a_sentinel.comment_count, a_sentinel.public_comment_count) == (5, 4)
+    assert Sentinel.objects.recount_comments() == 2
+    a_sentinel.refresh_from_db()
+    assert (a_sentinel.comment_count, a_sentinel.public_comment_count) == (5, 4)
+
+
+@pytest.mark.django_db
+def test_archived_thread_read_only_and_cached(client, a_sentinel, an_old_thread):
+    archive("--older-than", "365")
+    ct = ContentType.objects.get_for_model(a_sentinel)
+
+    html = Template("{% load comments %}{% list_archived_comments target %}").render(
+        Context({"target": a_sentinel})
+    )
+    for content in ("Lorem ipsum", "Old reply", "Deeper"):
+        assert content in html
+    assert "Private" not in html and "Below private" not in html
+    assert "hx-delete" not in html
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert archived_thread(ct.id, a_sentinel.pk) == html
+    assert not ctx.captured_queries
+
+    response = client.get(archive_url(ct.id, a_sentinel.pk))
+    assert response.status_code == HTTPStatus.OK
+    assert "public" in response.headers["Cache-Control"]
+    assert response.content.decode() == html
+
+
+@pytest.mark.django_db
+def test_archive_closed_targets(monkeypatch, a_sentinel, a_comment, a_live_thread):
+    closed = classmethod(lambda cls: cls.objects.filter(pk=a_live_thread.pk))
+    monkeypatch.setattr(Sentinel, "closed_for_comments", closed)
+    archive("--closed")
+    assert list(Comment.objects.all()) == [a_comment]
+    assert ArchivedComment.objects.get().content == "Fresh"
+
+    with pytest.raises(CommandError):
+        archive()
+
+
+@pytest.mark.django_db
+def test_archive_closed_uuid_targets(monkeypatch, a_commenter, a_live_thread):
+    slugged = SentinelSlugged.objects.create(title="Closed, uuid pk")
+    Comment.objects.create(
+        content="On uuid", author=a_commenter, content_object=slugged, is_public=True
+    )
+    closed = classmethod(lambda cls: cls.objects.all())
+    monkeypatch.setattr(SentinelSlugged, "closed_for_comments", closed)
+    archive("--closed")
+    assert ArchivedComment.objects.get().content == "On uuid"
+    assert Comment.objects.get().content == "Fresh"
+
+
+@pytest.mark.django_db
+def test_archive_many_threads_per_batch(a_commenter):
+    targets = Sentinel.objects.bulk_create(Sentinel(title=f"T{i}") for i in range(1200))
+    Comment.objects.bulk_create(
+        Comment(content="Old", author=a_commenter, content_object=target)
+        for target in targets
+    )
+    Comment.objects.update(modified=now() - timedelta(days=400))
+    archive("--older-than", "365", "--batch-size", "1000")
+    assert not Comment.objects.exists()
+    assert ArchivedComment.objects.count() == 1200
+
+
+@pytest.mark.django_db
+def test_archive_skips_threads_written_to_since(a_sentinel, an_old_thread, a_commenter):
+    before = now() - timedelta(days=365)
+    threads = list(stale_threads(before))
+    Comment.objects.create(
+        content="Revived", author=a_commenter, parent=an_old_thread[0]
+    )
+    targets = [(ct, pk) for ct, pk, _ in threads]
+    assert archive_threads(targets, before) == 0
+    assert Comment.objects.count() == len(an_old_thread) + 1
+    assert not ArchivedComment.objects.exists()
@@ -0,0 +1,96 @@
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponseRedirect
+from django.template.response import TemplateResponse
+
+from comments import async_views
+from comments.views import CARD
+
+
+def call(view, request, user, **kwargs):
+    request.user = user
+    return async_to_sync(view)(request, **kwargs)
+
+
+@pytest.mark.django_db
+def test_async_view_comment(async_rf, a_comment):
+    request = async_rf.get(f"/comments/view/{a_comment.id}")
+    response = call(
+        async_views.hx_view_comment, request, AnonymousUser(), id=a_comment.id
+    )
+    assert isinstance(response, TemplateResponse)
+    assert response.template_name == CARD
+    assert "ETag" in response.headers
+
+
+@pytest.mark.django_db
+def test_async_toggle_comment(async_rf, a_comment, a_commenter):
+    request = async_rf.post(f"/comments/toggle/{a_comment.id}")
+    response = call(
+        async_views.hx_toggle_comment, request, a_commenter, id=a_comment.id
+    )
+    assert response.status_code == HTTPStatus.OK
+    a_comment.refresh_from_db()
+    assert a_comment.is_public is False
+
+
+@pytest.mark.django_db
+def test_async_toggle_comment_forbidden(async_rf, a_comment, another_commenter):
+    request = async_rf.post(f"/comments/toggle/{a_comment.id}")
+    with pytest.raises(PermissionDenied):
+        call(async_views.hx_toggle_comment, request, another_commenter, id=a_comment.id)
+
+
+@pytest.mark.django_db
+def test_async_del_comment(async_rf, a_comment, a_commenter):
+    request = async_rf.get(f"/comments/delete/{a_comment.id}")
+    response = call(async_views.hx_del_comment, request, a_commenter, id=a_comment.id)
+    assert response.status_code == HTTPStatus.METHOD_NOT_ALLOWED
+
+    request = async_rf.delete(f"/comments/delete/{a_comment.id}")
+    response = call(async_views.hx_del_comment, request, a_commenter, id=a_comment.id)
+    assert response.headers["HX-Trigger"] == "commentDeleted"
+
+
+@pytest.mark.django_db
+def test_async_edit_comment_anonymous_redirected(async_rf, a_comment):
+    request = async_rf.get(f"/comments/edit/{a_comment.id}")
+    response = call(
+        async_views.hx_edit_comment, request, AnonymousUser(), id=a_comment.id
+    )
+    assert isinstance(response, HttpResponseRedirect)
+
+
+@pytest.mark.django_db
+def test_async_reply_and_list_replies(async_rf, a_comment, a_commenter):
+    request = async_rf.post(
+        f"/comments/reply/{a_comment.id}", {"content": "Async reply", "is_public": True}
+    )
+    call(async_views.hx_reply_comment, request, a_commenter, id=a_comment.id)
+    (new,) = a_comment.replies.all()
+
+    request = async_rf.get(f"/comments/replies/{a_comment.id}")
+    response = call(
+        async_views.hx_list_replies, request, AnonymousUser(), id=a_comment.id
+    )
+    assert response.context_data["comments"] == [new]
+
+
+@pytest.mark.django_db
+def test_async_add_comment(async_rf, a_sentinel, a_commenter):
+    ct = ContentType.objects.get_for_model(a_sentinel)
+    request = async_rf.post(a_sentinel.add_comment_url, {"content": "Async added"})
+    response = call(
+        async_views.add_comment,
+        request,
+        a_commenter,
+        content_type_id=ct.id,
+        lookup=str(a_sentinel.pk),
+    )
+    assert response.context_data["inserted"].content == "Async added"
+    assert a_sentinel.comments.get().author == a_commenter
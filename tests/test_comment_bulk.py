@@ -0,0 +1,59 @@
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.urls import reverse
+
+from comments.models import Comment
+from sentinels.models import Sentinel
+
+
+@pytest.fixture
+def many_sentinels():
+    return Sentinel.objects.bulk_create(Sentinel(title=f"Title {i}") for i in range(5))
+
+
+def counters():
+    return list(Sentinel.objects.values_list("comment_count", "public_comment_count"))
+
+
+@pytest.mark.django_db
+def test_create_for_objects(django_assert_max_num_queries, many_sentinels, a_commenter):
+    ContentType.objects.get_for_model(Sentinel)  # cached from here on
+    with django_assert_max_num_queries(4):  # savepoint, insert, counters, release
+        created = Comment.objects.create_for_objects(
+            many_sentinels, a_commenter, "Same text", is_public=True
+        )
+    assert len(created) == 5
+    assert counters() == [(1, 1)] * 5
+
+
+@pytest.mark.django_db
+def test_set_public_and_delete_for_objects(many_sentinels, a_commenter):
+    Comment.objects.create_for_objects(many_sentinels, a_commenter, "Some text")
+    assert counters() == [(1, 0)] * 5
+    assert Comment.objects.set_public(True) == 5
+    assert Comment.objects.set_public(True) == 0
+    assert counters() == [(1, 1)] * 5
+
+    deleted, _ = Comment.objects.for_objects(many_sentinels[:2]).delete()
+    assert deleted == 2
+    assert counters() == [(0, 0)] * 2 + [(1, 1)] * 3
+
+
+@pytest.mark.django_db
+def test_admin_make_private(admin_client, a_sentinel, a_comment):
+    url = reverse("admin:comments_comment_changelist")
+    data = {"action": "make_private", "_selected_action": [a_comment.pk]}
+    admin_client.post(url, data)
+    a_sentinel.refresh_from_db()
+    assert a_sentinel.public_comment_count == 0
+
+
+@pytest.mark.django_db
+def test_admin_delete_by_author(admin_client, a_sentinel, a_comment, a_commenter):
+    Comment.objects.create_for_objects([a_sentinel], a_commenter, "More spam")
+    url = reverse("admin:comments_comment_changelist")
+    data = {"action": "delete_by_author", "_selected_action": [a_comment.pk]}
+    admin_client.post(url, data)
+    assert not Comment.objects.exists()
+    a_sentinel.refresh_from_db()
+    assert a_sentinel.comment_count == 0
@@ -0,0 +1,81 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.template import Context, Template
+from django.urls import reverse
+
+from comments.cache import card_cache_stats, card_key, get_cache
+from comments.models import Comment
+
+
+def render_card(comment, user) -> str:
+    template = Template("{% load comments %}{% comment_detail comment %}")
+    return template.render(Context({"comment": comment, "user": user}))
+
+
+@pytest.mark.django_db
+def test_card_cached_per_ownership(a_comment, a_commenter, another_commenter):
+    before = card_cache_stats()
+    owner_html = render_card(a_comment, a_commenter)
+    assert render_card(a_comment, a_commenter) == owner_html
+    other_html = render_card(a_comment, another_commenter)
+    assert other_html != owner_html
+    assert "card-footer" in owner_html and "card-footer" not in other_html
+
+    after = card_cache_stats()
+    assert after["hits"] - before["hits"] == 1
+    assert after["misses"] - before["misses"] == 2
+
+
+@pytest.mark.django_db
+def test_card_forgotten_on_edit(client, a_comment, a_commenter):
+    render_card(a_comment, a_commenter)
+    render_card(a_comment, AnonymousUser())
+    assert get_cache().get(card_key(a_comment.id, False)) is not None
+
+    client.force_login(a_commenter)
+    url = reverse("comments:hx_edit_comment", kwargs={"id": a_comment.id})
+    response = client.post(url, data={"content": "Edited text", "is_public": True})
+    assert get_cache().get(card_key(a_comment.id, False)) is None
+    _, html = get_cache().get(card_key(a_comment.id, True))  # by the response
+    assert "Edited text" in html and "Edited text" in response.content.decode()
+
+
+def render_thread(target, user) -> str:
+    template = Template("{% load comments %}{% list_comments object %}")
+    return template.render(Context({"object": target, "user": user}))
+
+
+@pytest.mark.django_db
+def test_anonymous_thread_cached_until_written(
+    django_assert_num_queries,
+    django_capture_on_commit_callbacks,
+    a_sentinel,
+    a_comment,
+    a_commenter,
+):
+    anonymous = AnonymousUser()
+    assert a_comment.content in render_thread(a_sentinel, anonymous)
+    with django_assert_num_queries(0):
+        assert a_comment.content in render_thread(a_sentinel, anonymous)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Comment.objects.create(
+            content="A newer public comment",
+            author=a_commenter,
+            content_object=a_sentinel,
+            is_public=True,
+        )
+    assert "A newer public comment" in render_thread(a_sentinel, anonymous)
+
+
+@pytest.mark.django_db
+def test_card_forgotten_on_toggle_and_delete(client, a_comment, a_commenter):
+    key = card_key(a_comment.id, False)
+    client.force_login(a_commenter)
+    render_card(a_comment, AnonymousUser())
+    client.post(reverse("comments:hx_toggle_comment", kwargs={"id": a_comment.id}))
+    assert get_cache().get(key) is None
+
+    render_card(Comment.objects.get(), AnonymousUser())
+    client.delete(reverse("comments:hx_del_comment", kwargs={"id": a_comment.id}))
+    assert get_cache().get(key) is None
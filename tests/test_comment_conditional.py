@@ -0,0 +1,59 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.urls import reverse
+
+from comments.models import Comment
+
+
+def VIEW(comment):
+    return reverse("comments:hx_view_comment", kwargs={"id": comment.id})
+
+
+def LIST(target):
+    ct = ContentType.objects.get_for_model(target)
+    return reverse(
+        "comments:hx_list_comments",
+        kwargs={"content_type_id": ct.id, "object_id": target.pk},
+    )
+
+
+@pytest.mark.django_db
+def test_view_comment_not_modified(client, a_comment):
+    response = client.get(VIEW(a_comment))
+    assert response.status_code == HTTPStatus.OK
+    etag = response.headers["ETag"]
+    assert "Last-Modified" in response.headers
+
+    response = client.get(VIEW(a_comment), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.content == b""
+
+    a_comment.content = "Changed"
+    a_comment.save()
+    response = client.get(VIEW(a_comment), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+def test_view_comment_etag_varies_with_ownership(client, a_comment, a_commenter):
+    anonymous_etag = client.get(VIEW(a_comment)).headers["ETag"]
+    client.force_login(a_commenter)
+    assert client.get(VIEW(a_comment)).headers["ETag"] != anonymous_etag
+
+
+@pytest.mark.django_db
+def test_list_comments_not_modified(client, a_sentinel, a_comment, a_commenter):
+    etag = client.get(LIST(a_sentinel)).headers["ETag"]
+    response = client.get(LIST(a_sentinel), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    Comment.objects.create(
+        content="Another one",
+        author=a_commenter,
+        content_object=a_sentinel,
+        is_public=True,
+    )
+    response = client.get(LIST(a_sentinel), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
@@ -0,0 +1,49 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from comments.models import Comment
+from sentinels.models import Sentinel
+
+
+def counts(target):
+    target.refresh_from_db()
+    return target.comment_count, target.public_comment_count
+
+
+@pytest.mark.django_db
+def test_counters_follow_create_toggle_delete(client, a_commenter, a_sentinel):
+    client.force_login(a_commenter)
+    client.post(a_sentinel.add_comment_url, data={"content": "A private one"})
+    assert counts(a_sentinel) == (1, 0)
+
+    comment = a_sentinel.comments.get()
+    client.post(reverse("comments:hx_toggle_comment", kwargs={"id": comment.id}))
+    assert counts(a_sentinel) == (1, 1)
+
+    client.delete(reverse("comments:hx_del_comment", kwargs={"id": comment.id}))
+    assert counts(a_sentinel) == (0, 0)
+
+
+@pytest.mark.django_db
+def test_counters_follow_queryset_delete(a_sentinel, a_comment):
+    assert counts(a_sentinel) == (1, 1)
+    Comment.objects.filter(pk=a_comment.pk).delete()
+    assert counts(a_sentinel) == (0, 0)
+
+
+@pytest.mark.django_db
+def test_recount_comments(a_sentinel, a_comment):
+    Sentinel.objects.update(comment_count=0, public_comment_count=0)
+    assert Sentinel.objects.recount_comments() == 1
+    assert counts(a_sentinel) == (1, 1)
+
+
+@pytest.mark.django_db
+def test_with_comment_counts_single_query(a_sentinel, a_comment):
+    Sentinel.objects.create(title="Another sample title")
+    with CaptureQueriesContext(connection) as ctx:
+        page = Sentinel.objects.only("title").with_comment_counts()
+        assert [obj.public_comment_count for obj in page] == [1, 0]
+    assert len(ctx.captured_queries) == 1
@@ -0,0 +1,76 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.contenttypes.models import ContentType
+from django.urls import reverse
+
+from comments import async_views
+from comments.signals import comment_metrics
+
+sunk = []
+
+
+def a_sink(metrics, request):
+    sunk.append(metrics)
+
+
+@pytest.fixture
+def instrumented(settings):
+    settings.COMMENTS_INSTRUMENTATION = True
+    settings.COMMENTS_METRICS_SINKS = [f"{__name__}.a_sink"]
+    sunk.clear()
+    received = []
+
+    def receiver(sender, metrics, request, **kwargs):
+        received.append(metrics)
+
+    comment_metrics.connect(receiver)
+    yield received
+    comment_metrics.disconnect(receiver)
+
+
+@pytest.mark.django_db
+def test_view_reports_server_timing(client, instrumented, a_sentinel, a_comment):
+    ct = ContentType.objects.get_for_model(a_sentinel)
+    url = reverse(
+        "comments:hx_list_comments",
+        kwargs={"content_type_id": ct.id, "object_id": a_sentinel.pk},
+    )
+    response = client.get(url)
+    (metrics,) = instrumented
+    assert metrics.name == "hx_list_comments"
+    assert metrics.sql_count >= 2  # validators aggregate, then the page
+    assert metrics.rows >= 2  # the comment and its author
+    assert metrics.render_ms > 0
+    assert sunk == [metrics]
+    assert response.headers["Server-Timing"] == metrics.server_timing
+
+
+@pytest.mark.django_db
+def test_async_view_reports_server_timing(
+    async_rf, instrumented, a_sentinel, a_comment
+):
+    ct = ContentType.objects.get_for_model(a_sentinel)
+    request = async_rf.get("/comments/")
+    request.user = AnonymousUser()
+    response = async_to_sync(async_views.hx_list_comments)(
+        request, content_type_id=ct.id, object_id=str(a_sentinel.pk)
+    )
+    (metrics,) = instrumented
+    assert metrics.name == "hx_list_comments"
+    assert metrics.sql_count >= 2 and metrics.rows >= 2
+    assert metrics.render_ms > 0 and response.is_rendered
+    assert response.headers["Server-Timing"] == metrics.server_timing
+
+
+@pytest.mark.django_db
+def test_tag_reported_by_middleware(client, instrumented, a_sentinel, a_comment):
+    response = client.get(a_sentinel.get_absolute_url())
+    assert [metrics.name for metrics in instrumented] == ["list_comments"]
+    assert response.headers["Server-Timing"].startswith("list_comments;dur=")
+
+
+@pytest.mark.django_db
+def test_off_by_default(client, a_sentinel, a_comment):
+    response = client.get(a_sentinel.get_absolute_url())
+    assert "Server-Timing" not in response.headers
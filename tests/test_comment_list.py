@@ -0,0 +1,61 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.template.response import TemplateResponse
+from django.urls import reverse
+
+from comments.models import Comment
+from comments.pagination import get_page
+from comments.views import PAGE
+
+
+@pytest.fixture
+def many_comments(a_sentinel, a_commenter):
+    return [
+        Comment.objects.create(
+            content=f"Comment number {i}",
+            author=a_commenter,
+            content_object=a_sentinel,
+            is_public=True,
+        )
+        for i in range(5)
+    ]
+
+
+def ROUTE(target):
+    ct = ContentType.objects.get_for_model(target)
+    return reverse(
+        "comments:hx_list_comments",
+        kwargs={"content_type_id": ct.id, "object_id": target.pk},
+    )
+
+
+@pytest.mark.django_db
+def test_get_page_follows_cursor_without_overlap(a_sentinel, many_comments):
+    first, cursor = get_page(a_sentinel.comments.all(), size=2)
+    second, cursor = get_page(a_sentinel.comments.all(), cursor=cursor, size=2)
+    third, cursor = get_page(a_sentinel.comments.all(), cursor=cursor, size=2)
+    assert cursor is None
+    assert first + second + third == many_comments[::-1]
+
+
+@pytest.mark.django_db
+def test_list_comments_endpoint_next_page(client, settings, a_sentinel, many_comments):
+    settings.COMMENTS_PAGE_SIZE = 3
+    response = client.get(ROUTE(a_sentinel))
+    assert isinstance(response, TemplateResponse)
+    assert response.template_name == PAGE
+    assert response.context_data["comments"] == many_comments[:-4:-1]
+    next_url = response.context_data["next_url"]
+    assert 'hx-trigger="revealed"' in response.content.decode()
+
+    response = client.get(next_url)
+    assert response.context_data["comments"] == many_comments[1::-1]
+    assert response.context_data["next_url"] is None
+
+
+@pytest.mark.django_db
+def test_list_comments_endpoint_bad_cursor(client, a_sentinel):
+    response = client.get(ROUTE(a_sentinel), {"cursor": "not-a-cursor"})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
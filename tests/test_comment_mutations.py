@@ -0,0 +1,44 @@
+import uuid
+
+import pytest
+from django.core.exceptions import PermissionDenied
+from django.db import connection
+from django.http import Http404
+from django.test.utils import CaptureQueriesContext
+
+from comments.models import Comment
+
+
+@pytest.mark.django_db
+def test_toggle_for_user(a_comment, a_commenter):
+    with CaptureQueriesContext(connection) as ctx:
+        comment = Comment.objects.toggle_for_user(a_comment.id, a_commenter)
+    statements = [
+        query["sql"].split()[0]
+        for query in ctx.captured_queries
+        if "SAVEPOINT" not in query["sql"]
+    ]
+    # the flip, the read back with the author joined, the target's counters
+    assert statements == ["UPDATE", "SELECT", "UPDATE"]
+    assert comment.is_public is False
+    assert comment.modified > a_comment.modified
+    assert Comment.objects.toggle_for_user(a_comment.id, a_commenter).is_public
+
+
+@pytest.mark.django_db
+def test_toggle_for_user_forbidden_or_missing(a_comment, another_commenter):
+    with pytest.raises(PermissionDenied):
+        Comment.objects.toggle_for_user(a_comment.id, another_commenter)
+    with pytest.raises(Http404):
+        Comment.objects.toggle_for_user(uuid.uuid4(), another_commenter)
+    a_comment.refresh_from_db()
+    assert a_comment.is_public is True
+
+
+@pytest.mark.django_db
+def test_delete_for_user(a_comment, a_commenter, another_commenter):
+    with pytest.raises(PermissionDenied):
+        Comment.objects.delete_for_user(a_comment.id, another_commenter)
+    assert Comment.objects.delete_for_user(a_comment.id, a_commenter) == 1
+    with pytest.raises(Http404):
+        Comment.objects.delete_for_user(a_comment.id, a_commenter)
@@ -0,0 +1,84 @@
+import importlib
+from types import SimpleNamespace
+
+import pytest
+from django.apps import apps
+from django.db import connection
+
+from comments.models import Comment
+from sentinels.models import Sentinel, SentinelSlugged
+
+backfill = importlib.import_module(
+    "comments.migrations.0007_comment_typed_object_pk"
+).backfill_object_pks
+
+
+@pytest.fixture
+def a_slugged():
+    return SentinelSlugged.objects.create(title="Slugged title")
+
+
+@pytest.mark.django_db
+def test_typed_pk_follows_target(a_sentinel, a_slugged, a_comment, a_commenter):
+    assert (a_comment.object_pk_int, a_comment.object_pk_uuid) == (a_sentinel.pk, None)
+    created = a_slugged.comments.create(content="Via the relation", author=a_commenter)
+    assert created.object_id == str(a_slugged.pk)
+    (bulk,) = Comment.objects.create_for_objects([a_slugged], a_commenter, "Bulk")
+    assert bulk.object_pk_uuid == a_slugged.pk and bulk.object_pk_int is None
+    a_slugged.refresh_from_db()
+    assert a_slugged.comment_count == 2
+
+
+@pytest.mark.django_db
+def test_relation_joins_on_typed_pk(a_sentinel, a_slugged, a_comment, a_commenter):
+    Comment.objects.create(
+        content="Other", author=a_commenter, content_object=a_slugged
+    )
+    for qs in (
+        a_sentinel.comments.all(),
+        Sentinel.objects.filter(comments__is_public=True),
+        Comment.objects.filter(sentinels_sentinels__title=a_sentinel.title),
+    ):
+        sql = str(qs.query)
+        assert '"object_pk_int"' in sql and '"object_id"' not in sql.split("WHERE")[-1]
+    assert list(a_sentinel.comments.all()) == [a_comment]
+    assert list(Sentinel.objects.filter(comments__pk=a_comment.pk)) == [a_sentinel]
+    assert list(a_slugged.comments.values_list("content", flat=True)) == ["Other"]
+    assert list(SentinelSlugged.objects.filter(comments__isnull=False)) == [a_slugged]
+
+
+@pytest.mark.django_db
+def test_migration_backfills_typed_pk(a_sentinel, a_slugged, a_comment, a_commenter):
+    other = Comment.objects.create(
+        content="Other", author=a_commenter, content_object=a_slugged
+    )
+    Comment.objects.update(object_pk_int=None, object_pk_uuid=None)
+    backfill(apps, SimpleNamespace(connection=connection))
+    a_comment.refresh_from_db()
+    other.refresh_from_db()
+    assert a_comment.object_pk_int == a_sentinel.pk
+    assert other.object_pk_uuid == a_slugged.pk
+
+
+@pytest.mark.django_db
+def test_relation_add_refuses_other_targets(a_sentinel, a_comment, a_commenter):
+    other = Sentinel.objects.create(title="Other")
+    for bulk in (True, False):
+        with pytest.raises(ValueError):
+            other.comments.add(a_comment, bulk=bulk)
+    a_sentinel.comments.add(a_comment)  # already there
+    assert list(a_sentinel.comments.all()) == [a_comment]
+    assert not other.comments.exists()
+
+
+@pytest.mark.django_db
+def test_typed_pk_set_alone_moves_object_id(a_sentinel, a_comment):
+    other = Sentinel.objects.create(title="Other")
+    comment = Comment.objects.get()
+    comment.object_pk_int = other.pk
+    comment.save()
+    comment.refresh_from_db()
+    assert (comment.object_id, comment.object_pk_int) == (str(other.pk), other.pk)
+    comment.content_object = a_sentinel  # sets `object_id` only
+    comment.save()
+    assert comment.object_pk_int == a_sentinel.pk
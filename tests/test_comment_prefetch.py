@@ -0,0 +1,41 @@
+import pytest
+from django.template import Context, Template
+
+from comments.models import Comment
+from sentinels.models import Sentinel
+
+
+@pytest.fixture
+def threads(a_commenter, another_commenter):
+    targets = Sentinel.objects.bulk_create(Sentinel(title=f"T{i}") for i in range(4))
+    for target in targets:
+        for i in range(3):
+            Comment.objects.create(
+                content=f"{target.title} comment {i}",
+                author=a_commenter if i else another_commenter,
+                content_object=target,
+                is_public=i != 1,
+            )
+    return targets
+
+
+def render_all(targets, user) -> str:
+    template = Template(
+        "{% load comments %}{% for obj in objects %}{% list_comments obj %}{% endfor %}"
+    )
+    return template.render(Context({"objects": targets, "user": user}))
+
+
+@pytest.mark.django_db
+def test_prefetched_threads_render_in_two_queries(
+    settings, django_assert_num_queries, threads, another_commenter
+):
+    settings.COMMENTS_PAGE_SIZE = 1
+    with django_assert_num_queries(2):  # targets, then all their threads
+        targets = list(Sentinel.objects.prefetch_visible_comments(another_commenter))
+        html = render_all(targets, another_commenter)
+    for target in targets:
+        assert len(target.visible_comments) == 2  # a page of 1, and 1 to spare
+        assert f"{target.title} comment 2" in html
+        assert f"{target.title} comment 1" not in html  # private, by someone else
+    assert html.count('hx-trigger="revealed"') == 4
@@ -0,0 +1,36 @@
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.template import Context, Template
+from django.test.utils import CaptureQueriesContext
+
+from comments.models import Comment
+from sentinels.models import Sentinel
+
+
+def render_thread(target, user) -> int:
+    """Number of queries it takes to render the thread of `target`."""
+    template = Template("{% load comments %}{% list_comments object %}")
+    with CaptureQueriesContext(connection) as ctx:
+        template.render(Context({"object": target, "user": user}))
+    return len(ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_thread_query_count_is_constant(settings, a_commenter, another_commenter):
+    settings.COMMENTS_PAGE_SIZE = 1000
+    counts = []
+    for size in (1, 100, 1000):
+        target = Sentinel.objects.create(title=f"Thread of {size}")
+        Comment.objects.bulk_create(
+            Comment(
+                content=f"Comment {i}",
+                author=a_commenter if i % 2 else another_commenter,
+                content_type=ContentType.objects.get_for_model(target),
+                object_id=str(target.pk),
+                is_public=True,
+            )
+            for i in range(size)
+        )
+        counts.append(render_thread(target, a_commenter))
+    assert counts[0] == counts[1] == counts[2]
@@ -0,0 +1,128 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from comments.models import Comment, path_segment
+from comments.pagination import get_page
+from comments.replies import load_replies
+
+
+def reply(parent, author, content, is_public=True):
+    return Comment.objects.create(
+        content=content, author=author, parent=parent, is_public=is_public
+    )
+
+
+@pytest.fixture
+def a_tree(a_comment, a_commenter, another_commenter):
+    """a_comment > first > deep; a_comment > second (private) > hidden"""
+    first = reply(a_comment, another_commenter, "First reply")
+    deep = reply(first, a_commenter, "Deep reply")
+    second = reply(a_comment, another_commenter, "Second reply", is_public=False)
+    hidden = reply(second, another_commenter, "Below a private reply")
+    return first, deep, second, hidden
+
+
+def counts(target):
+    target.refresh_from_db()
+    return target.comment_count, target.public_comment_count
+
+
+@pytest.mark.django_db
+def test_replies_placed_under_parent(a_sentinel, a_comment, a_tree):
+    first, deep, second, hidden = a_tree
+    assert deep.path.startswith(first.path) and first.path.startswith(a_comment.path)
+    assert (deep.depth, deep.content_object) == (2, a_sentinel)
+    a_comment.refresh_from_db()
+    assert a_comment.reply_count == 2
+    assert counts(a_sentinel) == (5, 4)
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert list(Comment.objects.subtree(a_comment)) == [first, deep, second, hidden]
+        assert list(Comment.objects.subtree(a_comment, depth=1)) == [first, second]
+    assert len(ctx.captured_queries) == 2
+
+    page, _ = get_page(a_sentinel.comments.top_level())
+    assert page == [a_comment]
+
+
+@pytest.mark.django_db
+def test_load_replies_prunes_below_invisible(a_comment, a_commenter, a_tree):
+    first, deep, second, hidden = a_tree
+    replies = load_replies(a_comment, a_commenter)
+    assert replies == [first, deep]
+    assert [(c.indent, c.replies_loaded) for c in replies] == [(0, True), (1, True)]
+    assert [c.replies_loaded for c in load_replies(a_comment, a_commenter, 1)] == [
+        False
+    ]
+
+
+@pytest.mark.django_db
+def test_delete_takes_replies_along(a_sentinel, a_comment, a_tree):
+    first, deep, second, hidden = a_tree
+    deep.delete()
+    first.refresh_from_db()
+    assert first.reply_count == 0
+
+    Comment.objects.filter(pk=second.pk).delete()
+    assert not Comment.objects.filter(pk=hidden.pk).exists()
+    a_comment.refresh_from_db()
+    assert a_comment.reply_count == 1
+    assert counts(a_sentinel) == (2, 2)
+
+    a_comment.delete()
+    assert counts(a_sentinel) == (0, 0)
+    assert not Comment.objects.exists()
+
+
+@pytest.mark.django_db
+def test_reply_endpoints(client, a_comment, a_commenter, another_commenter):
+    client.force_login(another_commenter)
+    url = reverse("comments:hx_reply_comment", kwargs={"id": a_comment.id})
+    assert "<form" in client.get(url).content.decode()
+    response = client.post(url, {"content": "Replying", "is_public": True})
+    assert "Replying" in response.content.decode()
+    (new,) = a_comment.replies.all()
+    assert new.author == another_commenter
+
+    client.force_login(a_commenter)
+    response = client.get(
+        reverse("comments:hx_list_replies", kwargs={"id": a_comment.id})
+    )
+    assert response.context_data["comments"] == [new]
+    assert new.reply_url in response.content.decode()
+
+    page = client.get(a_comment.content_object.get_absolute_url()).content.decode()
+    assert a_comment.replies_url in page and "1 reply<" in page
+    assert "Replying" not in page  # top level only, replies load on demand
+
+
+@pytest.mark.django_db
+def test_bulk_delete_of_many_roots(a_sentinel, a_commenter, another_commenter):
+    """One query term per level of replies, not per root: SQLite rejects
+    expressions more than 1000 terms deep."""
+    roots = Comment.objects.create_for_objects(
+        [a_sentinel] * 1100, a_commenter, "Root", is_public=True
+    )
+    Comment.objects.bulk_create(
+        Comment(
+            content="Reply",
+            author=another_commenter,
+            parent=root,
+            path=root.path + path_segment(),
+            depth=1,
+            content_object=a_sentinel,
+            is_public=True,
+        )
+        for root in roots
+    )
+    Comment.objects.update(reply_count=1)
+    Comment.objects.filter(depth=1).update(reply_count=0)
+
+    assert Comment.objects.filter(author=a_commenter).with_descendants().count() == 2200
+    assert Comment.objects.filter(author=a_commenter).soft_delete() == 2200
+    assert not Comment.objects.exists()
+    Comment.all_objects.update(deleted_at=None)
+    Comment.objects.filter(author=a_commenter).delete()
+    assert not Comment.all_objects.exists()
@@ -0,0 +1,75 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.db import transaction
+from django.template import Context, Template
+from django.urls import reverse
+
+from comments.instrumentation import instrument
+from comments.models import Comment
+from comments.routers import STICKY_COOKIE, use_primary
+
+# both databases start empty and nothing replicates between them: a comment only
+# visible on the primary shows which one a read went to
+replicated = pytest.mark.django_db(transaction=True, databases=["default", "replica"])
+
+
+@pytest.fixture
+def replica(settings):
+    settings.COMMENTS_REPLICA_DATABASE = "replica"
+    settings.COMMENTS_PRIMARY_STICKY_SECONDS = 60
+
+
+@replicated
+def test_reads_from_replica_writes_to_primary(replica, a_comment):
+    assert Comment.objects.db == "replica"
+    assert not Comment.objects.exists()
+    assert Comment.objects.using("default").get() == a_comment
+
+    with use_primary():
+        assert Comment.objects.get() == a_comment
+    with transaction.atomic():
+        assert Comment.objects.get() == a_comment
+    assert not Comment.objects.exists()
+
+
+@replicated
+def test_writer_reads_own_writes(client, replica, a_commenter, a_sentinel):
+    client.force_login(a_commenter)
+    response = client.post(a_sentinel.add_comment_url, {"content": "Just posted"})
+    assert response.status_code == HTTPStatus.OK
+    assert STICKY_COOKIE in response.cookies
+    comment = Comment.objects.using("default").get()
+
+    url = reverse("comments:hx_view_comment", kwargs={"id": comment.id})
+    assert client.get(url).status_code == HTTPStatus.OK  # sticky: primary
+
+    del client.cookies[STICKY_COOKIE]
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND  # replica lags
+
+
+@replicated
+def test_no_replica_configured(client, a_comment):
+    assert Comment.objects.db == "default"
+    url = reverse("comments:hx_toggle_comment", kwargs={"id": a_comment.id})
+    client.force_login(a_comment.author)
+    response = client.post(url)
+    assert STICKY_COOKIE not in response.cookies
+
+
+@replicated
+def test_thread_cache_filled_from_primary(replica, a_sentinel, a_comment):
+    template = Template("{% load comments %}{% list_comments object %}")
+    html = template.render(Context({"object": a_sentinel, "user": AnonymousUser()}))
+    assert a_comment.content in html  # not the lagging replica's empty thread
+    assert not Comment.objects.exists()
+
+
+@replicated
+def test_instrumentation_counts_replica_queries(settings, replica, a_comment):
+    settings.COMMENTS_INSTRUMENTATION = True
+    with instrument("reads") as metrics:
+        assert not Comment.objects.exists()
+        assert Comment.objects.using("default").exists()
+    assert metrics.sql_count == 2
@@ -0,0 +1,86 @@
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.urls import reverse
+
+from comments.models import Comment
+from comments.search import fts5_query
+from sentinels.models import Sentinel
+
+
+@pytest.fixture
+def other_sentinel():
+    return Sentinel.objects.create(title="Another title")
+
+
+@pytest.fixture
+def searchable(a_sentinel, other_sentinel, a_commenter, another_commenter):
+    def make(target, author, content, is_public=True):
+        return Comment.objects.create(
+            content=content, author=author, content_object=target, is_public=is_public
+        )
+
+    return [
+        make(a_sentinel, a_commenter, "The quick brown fox"),
+        make(a_sentinel, another_commenter, "A lazy brown dog", is_public=False),
+        make(other_sentinel, a_commenter, "Brown bears sleep all winter"),
+    ]
+
+
+def test_fts5_query_quotes_terms():
+    assert fts5_query('brown "fox" OR NEAR(') == '"brown" "fox" "OR" "NEAR"*'
+
+
+@pytest.mark.django_db
+def test_search_follows_create_edit_and_delete(searchable):
+    fox, dog, bears = searchable
+    assert set(Comment.objects.search("brown")) == {fox, dog, bears}
+    assert list(Comment.objects.search("quick fo")) == [fox]  # prefix of last word
+
+    fox.content = "The quick red fox"
+    fox.save(update_fields=["content", "modified"])
+    assert set(Comment.objects.search("brown")) == {dog, bears}
+    assert list(Comment.objects.search("red")) == [fox]
+
+    bears.delete()
+    Comment.objects.filter(pk=dog.pk).update(content="A lazy grey dog")
+    assert not Comment.objects.search("brown").exists()
+    assert not Comment.objects.search("  ").exists()
+
+
+@pytest.mark.django_db
+def test_search_endpoint_visibility_and_scope(client, a_sentinel, searchable):
+    fox, dog, bears = searchable
+    response = client.get(reverse("comments:search_comments"), {"q": "brown"})
+    assert set(response.context_data["comments"]) == {fox, bears}
+
+    client.force_login(dog.author)
+    ct = ContentType.objects.get_for_model(a_sentinel)
+    url = reverse(
+        "comments:search_thread_comments",
+        kwargs={"content_type_id": ct.id, "object_id": a_sentinel.pk},
+    )
+    response = client.get(url, {"q": "brown"})
+    assert set(response.context_data["comments"]) == {fox, dog}
+
+
+@pytest.mark.django_db
+def test_search_endpoint_next_page(client, settings, searchable):
+    settings.COMMENTS_PAGE_SIZE = 1
+    response = client.get(reverse("comments:search_comments"), {"q": "brown"})
+    assert response.context_data["comments"] == [searchable[2]]
+    response = client.get(response.context_data["next_url"])
+    assert response.context_data["comments"] == [searchable[0]]
+    assert response.context_data["next_url"] is None
+
+
+@pytest.mark.django_db
+def test_search_keyed_on_ids_not_rowids(searchable):
+    fox, dog, bears = searchable
+    if connection.vendor == "sqlite":  # as `VACUUM` or a remade table may do
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE comments_comment SET rowid = rowid + 100")
+    assert set(Comment.objects.search("brown")) == {fox, dog, bears}
+    fox.delete()
+    assert list(Comment.objects.search("winter")) == [bears]
+    assert set(Comment.objects.search("brown")) == {dog, bears}
@@ -1,26 +1,56 @@
 from http import HTTPStatus
 
 import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
 from django.http import HttpResponse, HttpResponseRedirect
 from django.template.response import TemplateResponse
-from django.urls import URLPattern
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-from sentinels.models import Sentinel
+from comments import views
+from comments.registry import registry
+from sentinels.models import Sentinel, SentinelSlugged
 
 
 @pytest.mark.django_db
 def test_sentinel_instance_add_comment_url_exists(a_sentinel):
-    assert Sentinel._comment_label == "add_comment_sentinel"
-    assert hasattr(a_sentinel, "add_comment_url")
-    assert a_sentinel.add_comment_url == f"/{Sentinel._comment_label}/1"
+    ct = ContentType.objects.get_for_model(a_sentinel)
+    assert a_sentinel.add_comment_url == reverse(
+        "comments:add_comment", kwargs={"content_type_id": ct.id, "lookup": 1}
+    )
 
 
 @pytest.mark.django_db
-def test_sentinel_instance_add_comment_path_exists(a_sentinel):
-    assert Sentinel._comment_label == "add_comment_sentinel"
-    assert hasattr(a_sentinel, "add_comment_path")
-    assert isinstance(a_sentinel.add_comment_path, URLPattern)
-    assert a_sentinel.add_comment_path.name == Sentinel._comment_label
+def test_commentable_models_registered():
+    assert registry.lookups == {Sentinel: "pk", SentinelSlugged: "slug"}
+    target = SentinelSlugged.objects.create(title="Slugged title")
+    assert target.add_comment_url.endswith(f"/{target.slug}")
+
+
+def test_per_model_routes_deprecated():
+    with pytest.deprecated_call():
+        route = Sentinel.set_add_comment_path("<int:pk>", views.add_comment_to)
+    assert route.name == "add_comment_sentinel"
+
+
+@pytest.mark.django_db
+def test_add_comment_checks_target_by_pk_only(client, a_commenter, a_sentinel):
+    client.force_login(a_commenter)
+    with CaptureQueriesContext(connection) as ctx:
+        client.post(a_sentinel.add_comment_url, data={"content": "Cheap"})
+    reads = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("SELECT")]
+    (lookup,) = [sql for sql in reads if "sentinels_" in sql]
+    assert lookup.startswith('SELECT "sentinels_sentinel"."id" FROM')
+    assert a_sentinel.comments.get().content == "Cheap"
+
+    missing = a_sentinel.add_comment_url.replace("/1", "/404")
+    assert client.post(missing, data={"content": "Lost"}).status_code == 404
+    ct = ContentType.objects.get_for_model(a_commenter)
+    url = reverse(
+        "comments:add_comment", kwargs={"content_type_id": ct.id, "lookup": 1}
+    )
+    assert client.get(url).status_code == 404  # users are not commentable
 
 
 @pytest.mark.django_db
@@ -42,7 +72,8 @@ def test_add_comment_post_authenticated(rf, a_commenter, a_sentinel):
     test_text = "New content in lorem ipsum formatting"
     request = rf.post(a_sentinel.add_comment_url, data={"content": test_text})
     request.user = a_commenter
-    response = Sentinel.add_comment_func(request, a_sentinel.pk)
+    ct = ContentType.objects.get_for_model(a_sentinel)
+    response = views.add_comment(request, ct.id, str(a_sentinel.pk))
     assert isinstance(response, TemplateResponse)
     assert HTTPStatus.OK == response.status_code
     assert "comments/inserter.html" == response.template_name
@@ -59,3 +90,21 @@ def test_sentinel_detail_page_text_contains_comment_content(
     assert isinstance(response, HttpResponse)
     assert HTTPStatus.OK == response.status_code
     assert x in response.content
+
+
+@pytest.mark.django_db
+def test_add_comment_post_renders_fresh_form_inline(client, a_commenter, a_sentinel):
+    client.force_login(a_commenter)
+    response = client.post(a_sentinel.add_comment_url, data={"content": "Inline"})
+    html = response.content.decode()
+    assert 'hx-trigger="load"' not in html
+    assert f'hx-post="{a_sentinel.add_comment_url}"' in html
+    assert not response.context_data["new_form"].is_bound
+
+
+@pytest.mark.django_db
+def test_sentinel_detail_page_renders_form_inline(client, a_commenter, a_sentinel):
+    client.force_login(a_commenter)
+    html = client.get(a_sentinel.get_absolute_url()).content.decode()
+    assert 'hx-trigger="load"' not in html
+    assert f'hx-post="{a_sentinel.add_comment_url}"' in html
@@ -0,0 +1,56 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from comments.models import Comment
+
+
+@pytest.fixture
+def soft_delete(settings):
+    settings.COMMENTS_SOFT_DELETE = True
+
+
+def counts(target):
+    target.refresh_from_db()
+    return target.comment_count, target.public_comment_count
+
+
+@pytest.mark.django_db
+def test_delete_view_only_hides(client, soft_delete, a_sentinel, a_commenter):
+    parent = Comment.objects.create(
+        content="Parent", author=a_commenter, content_object=a_sentinel
+    )
+    comment = Comment.objects.create(
+        content="Soon gone", author=a_commenter, parent=parent, is_public=True
+    )
+    Comment.objects.create(content="Below it", author=a_commenter, parent=comment)
+    client.force_login(a_commenter)
+
+    url = reverse("comments:hx_del_comment", kwargs={"id": comment.id})
+    response = client.delete(url)
+    assert response.status_code == HTTPStatus.OK
+    assert Comment.all_objects.count() == 3
+    assert Comment.all_objects.exclude(deleted_at=None).count() == 2
+    assert list(a_sentinel.comments.all()) == [parent]
+    assert not Comment.objects.search("gone").exists()
+    assert counts(a_sentinel) == (1, 0)
+    parent.refresh_from_db()
+    assert parent.reply_count == 0
+
+    response = client.delete(url)  # already gone, for viewers as for its author
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_purge_in_batches(soft_delete, a_sentinel, a_commenter, a_comment):
+    Comment.objects.create_for_objects([a_sentinel] * 5, a_commenter, "Spam")
+    assert Comment.objects.filter(content="Spam").discard() == 5
+
+    call_command("purge_comments", older_than=1, pause=0)
+    assert Comment.all_objects.count() == 6  # not old enough
+
+    call_command("purge_comments", batch_size=2, pause=0)
+    assert list(Comment.all_objects.all()) == [a_comment]
+    assert counts(a_sentinel) == (1, 1)  # not decremented twice
@@ -0,0 +1,75 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.contenttypes.models import ContentType
+from django.urls import reverse
+
+from comments.models import Comment
+from comments.streaming import HEAD, TAIL, astream_thread, stream_thread
+
+
+@pytest.fixture
+def a_thread(a_sentinel, a_commenter, another_commenter):
+    return [
+        Comment.objects.create(
+            content=f"Streamed {i}",
+            author=a_commenter if i % 2 else another_commenter,
+            content_object=a_sentinel,
+            is_public=i != 4,
+        )
+        for i in range(5)
+    ]
+
+
+@pytest.mark.django_db
+def test_stream_thread_in_chunks(a_sentinel, a_commenter, a_thread):
+    visible = a_sentinel.comments.visible_to(a_commenter).for_cards()
+    chunks = list(stream_thread(visible, a_commenter, chunk_size=2))
+    assert chunks[0] == HEAD and chunks[-1] == TAIL
+    assert [chunk.count("<section") for chunk in chunks[1:-1]] == [2, 2]
+    html = "".join(chunks)
+    assert html.index("Streamed 3") < html.index("Streamed 0")  # newest first
+    assert "Streamed 4" not in html  # private, of another author
+
+
+@pytest.mark.django_db
+def test_stream_thread_replies_follow_parents(a_sentinel, a_commenter, a_thread):
+    older, private, newer = a_thread[0], a_thread[4], a_thread[3]
+
+    def reply(parent, content, is_public=True):
+        return Comment.objects.create(
+            content=content, author=a_commenter, parent=parent, is_public=is_public
+        )
+
+    reply(reply(older, "Reply to older"), "Nested reply")
+    reply(private, "Below a private one")
+    visible = a_sentinel.comments.visible_to(a_commenter).for_cards()
+    html = "".join(stream_thread(visible, a_commenter, chunk_size=2))
+    order = ["Streamed 3", "Streamed 2", "Streamed 1", "Streamed 0", "Reply to older"]
+    positions = [html.index(content) for content in order + ["Nested reply"]]
+    assert positions == sorted(positions)
+    assert newer.content in html and "Below a private one" not in html
+
+
+@pytest.mark.django_db
+def test_astream_thread_matches_stream_thread(a_sentinel, a_thread):
+    visible = a_sentinel.comments.visible_to(AnonymousUser()).for_cards()
+
+    async def consume():
+        return [chunk async for chunk in astream_thread(visible, AnonymousUser(), 3)]
+
+    assert async_to_sync(consume)() == list(stream_thread(visible, AnonymousUser(), 3))
+
+
+@pytest.mark.django_db
+def test_stream_comments_endpoint(client, a_sentinel, a_thread):
+    ct = ContentType.objects.get_for_model(a_sentinel)
+    response = client.get(
+        reverse(
+            "comments:stream_comments",
+            kwargs={"content_type_id": ct.id, "object_id": a_sentinel.pk},
+        )
+    )
+    assert response.streaming
+    html = b"".join(response.streaming_content).decode()
+    assert html.count("<section") == 4
@@ -0,0 +1,84 @@
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from comments import async_views
+from comments.throttle import get_buckets, refill, throttle_counts, throttle_stats
+
+
+@pytest.fixture
+def limits(settings):
+    settings.COMMENTS_RATE_LIMIT_BUCKETS = "comments.throttle.LocalBuckets"
+    settings.COMMENTS_RATE_LIMITS = {"user": "2/m", "ip": "3/m"}
+    get_buckets().clear()
+    throttle_counts.clear()
+    yield settings.COMMENTS_RATE_LIMITS
+    get_buckets().clear()
+
+
+def test_refill_token_bucket():
+    taken, bucket = refill(None, "2/s", at=0.0)
+    assert taken and bucket == (1, 0.0)
+    taken, bucket = refill(bucket, "2/s", at=0.0)
+    assert taken and bucket == (0, 0.0)
+    taken, bucket = refill(bucket, "2/s", at=0.25)
+    assert not taken  # half a token
+    taken, bucket = refill(bucket, "2/s", at=0.5)
+    assert taken
+
+
+@pytest.mark.django_db
+def test_user_limit_rejects_before_orm_work(client, limits, a_commenter, a_sentinel):
+    client.force_login(a_commenter)
+    for _ in range(2):
+        response = client.post(a_sentinel.add_comment_url, {"content": "Quick"})
+        assert response.status_code == HTTPStatus.OK
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.post(a_sentinel.add_comment_url, {"content": "Too quick"})
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert response.headers["Retry-After"] == "30"
+    assert not any("comments_comment" in q["sql"] for q in ctx.captured_queries)
+    assert a_sentinel.comments.count() == 2
+    assert throttle_stats() == {"accepted": 2, "throttled": 1, "ratio": 1 / 3}
+
+    response = client.get(a_sentinel.add_comment_url)  # reads are not limited
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+def test_user_limit_spans_logins(limits, a_commenter, a_sentinel):
+    limits["ip"] = "100/m"
+    statuses = []
+    for _ in range(3):  # each login a new session
+        client = Client()
+        client.force_login(a_commenter)
+        response = client.post(a_sentinel.add_comment_url, {"content": "Again"})
+        statuses.append(response.status_code)
+    assert statuses == [HTTPStatus.OK] * 2 + [HTTPStatus.TOO_MANY_REQUESTS]
+
+
+@pytest.mark.django_db
+def test_ip_limit_applies_to_anonymous(client, limits, a_comment):
+    url = reverse("comments:hx_toggle_comment", kwargs={"id": a_comment.id})
+    statuses = [client.post(url).status_code for _ in range(4)]
+    assert statuses == [HTTPStatus.FOUND] * 3 + [HTTPStatus.TOO_MANY_REQUESTS]
+
+
+@pytest.mark.django_db
+def test_async_view_throttled(async_rf, limits, a_comment, a_commenter):
+    limits["ip"] = "1/m"
+    url = f"/comments/toggle/{a_comment.id}"
+    responses = []
+    for _ in range(2):
+        request = async_rf.post(url)
+        request.user = a_commenter
+        responses.append(
+            async_to_sync(async_views.hx_toggle_comment)(request, id=a_comment.id)
+        )
+    assert [r.status_code for r in responses] == [200, 429]
@@ -0,0 +1,112 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from comments.models import Comment
+from comments.transfer import dump, load
+
+
+def export(*args) -> str:
+    out = StringIO()
+    call_command("export_comments", *args, stdout=out, stderr=StringIO())
+    return out.getvalue()
+
+
+def import_(tmp_path, text: str, *args):
+    path = tmp_path / "comments.jsonl"
+    path.write_text(text)
+    err = StringIO()
+    call_command("import_comments", str(path), *args, stderr=err)
+    return err.getvalue()
+
+
+@pytest.mark.django_db
+def test_round_trip(tmp_path, a_sentinel, a_comment, another_commenter):
+    reply = Comment.objects.create(
+        content="A reply", author=another_commenter, parent=a_comment
+    )
+    dumped = export()
+    lines = dumped.splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [
+        str(a_comment.id),
+        str(reply.id),
+    ]
+    assert json.loads(lines[0])["content_type"] == "sentinels.sentinel"
+
+    before = {c.pk: (c.created, c.path, c.depth) for c in Comment.objects.all()}
+    Comment.objects.all().delete()
+    report = import_(tmp_path, dumped, "--batch-size", "1")
+    assert "Imported 2 comments" in report
+
+    after = {c.pk: (c.created, c.path, c.depth) for c in Comment.objects.all()}
+    assert after == before
+    a_comment.refresh_from_db()
+    assert a_comment.reply_count == 1
+    a_sentinel.refresh_from_db()
+    assert (a_sentinel.comment_count, a_sentinel.public_comment_count) == (2, 1)
+    assert Comment.objects.search("separate").get() == a_comment
+
+
+@pytest.mark.django_db
+def test_legacy_lines_get_ids_and_paths(tmp_path, a_sentinel, a_commenter):
+    parent_id = "8a7b5d0e-32b1-4bb5-93e3-8d1c3f0e2a11"
+    base = {"content_type": "sentinels.sentinel", "object_id": a_sentinel.pk}
+    records = [
+        {**base, "id": parent_id, "author": a_commenter.pk, "content": "Old post",
+         "is_public": True, "created": "2015-03-01T10:00:00+00:00"},
+        {**base, "author": a_commenter.pk, "content": "Old reply",
+         "parent": parent_id, "created": "2015-03-02T10:00:00+00:00"},
+    ]  # fmt: skip
+    text = "".join(json.dumps(r) + "\n" for r in records)
+    import_(tmp_path, text)
+
+    parent, reply = Comment.objects.order_by("path")
+    assert (parent.created.year, parent.modified) == (2015, parent.created)
+    assert reply.path.startswith(parent.path) and reply.depth == 1
+    assert parent.reply_count == 1
+
+
+@pytest.mark.django_db
+def test_load_leaves_other_writes_stamped(a_sentinel, a_comment, a_commenter):
+    reply = Comment.objects.create(
+        content="A reply", author=a_commenter, parent=a_comment
+    )
+    lines = list(dump(Comment.objects.all()))
+    Comment.objects.all().delete()
+    loading = load(lines, batch_size=1)
+    assert next(loading) == 1
+
+    # written while the import is paused between batches
+    written = Comment.objects.create(
+        content="Meanwhile", author=a_commenter, content_object=a_sentinel
+    )
+    assert written.created > reply.created
+    assert list(loading) == [1]
+    assert Comment.objects.get(pk=reply.pk).created == reply.created
+
+
+@pytest.mark.django_db(transaction=True)
+def test_import_with_deferred_indexes(tmp_path, a_comment):
+    dumped = export()
+    Comment.objects.all().delete()
+    import_(tmp_path, dumped, "--defer-indexes")
+    assert Comment.objects.search("unique text").get() == a_comment
+
+
+@pytest.mark.django_db
+def test_load_inserts_timestamps_as_they_are(a_comment, a_commenter):
+    Comment.objects.create(content="A reply", author=a_commenter, parent=a_comment)
+    lines = list(dump(Comment.objects.all()))
+    before = {c.pk: (c.created, c.modified) for c in Comment.objects.all()}
+    Comment.objects.all().delete()
+    with CaptureQueriesContext(connection) as ctx:
+        assert list(load(lines)) == [2]
+    inserts = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("INSERT")]
+    assert len(inserts) == 1
+    updates = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+    assert all('"created"' not in sql for sql in updates)  # reply counts only
+    assert {c.pk: (c.created, c.modified) for c in Comment.objects.all()} == before
@@ -0,0 +1,28 @@
+import uuid
+
+import pytest
+from django.urls import clear_script_prefix, reverse, set_script_prefix
+
+from comments.models import comment_url
+
+
+@pytest.mark.parametrize(
+    "name",
+    ["hx_view_comment", "hx_edit_comment", "hx_del_comment", "hx_toggle_comment"],
+)
+def test_comment_url_matches_reverse(name):
+    id = uuid.uuid4()
+    assert comment_url(name, id) == reverse(f"comments:{name}", kwargs={"id": id})
+
+
+def test_comment_url_follows_script_prefix():
+    id = uuid.uuid4()
+    set_script_prefix("/mounted/")
+    try:
+        assert comment_url("hx_view_comment", id).startswith("/mounted/")
+        assert comment_url("hx_view_comment", id) == reverse(
+            "comments:hx_view_comment", kwargs={"id": id}
+        )
+    finally:
+        clear_script_prefix()
+    assert not comment_url("hx_view_comment", id).startswith("/mounted/")